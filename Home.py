@@ -1,5 +1,7 @@
 import streamlit as st
-import base64
+
+from mediguide import metrics, warmup
+from mediguide.theme import apply_theme
 
 # -------------------------------------------------
 # Page Configuration
@@ -9,76 +11,21 @@ st.set_page_config(
     layout="wide"
 )
 
+# -------------------------------------------------
+# Warm up every page's models in the background
+# -------------------------------------------------
+warmup.start()
+
 # -------------------------------------------------
 # Theme Toggle
 # -------------------------------------------------
 theme = st.toggle("Dark Mode")
 
-overlay = "rgba(15,23,42,0.85)" if theme else "rgba(255,255,255,0.78)"
-text_color = "#e5e7eb" if theme else "#111827"
-card_bg = "#020617" if theme else "#ffffff"
-
 # -------------------------------------------------
-# Background Loader
+# Background + CSS (cached per theme, image served statically)
 # -------------------------------------------------
-def set_bg_from_local(image_path):
-    with open(image_path, "rb") as img_file:
-        encoded = base64.b64encode(img_file.read()).decode()
-
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background:
-                linear-gradient({overlay}, {overlay}),
-                url("data:image/jpg;base64,{encoded}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-            color: {text_color};
-        }}
-
-        .hero-title {{
-            font-size: 46px;
-            font-weight: 600;
-            text-align: center;
-            color: #1f77ff;
-            margin-bottom: 10px;
-        }}
-
-        .section-card {{
-            background: {card_bg};
-            padding: 24px;
-            border-radius: 16px;
-            box-shadow: 0 12px 30px rgba(0,0,0,0.12);
-            transition: all 0.3s ease;
-            height: 100%;
-            color: {text_color};
-        }}
-
-        .section-card:hover {{
-            transform: translateY(-6px) scale(1.01);
-            box-shadow: 0 22px 40px rgba(0,0,0,0.25);
-        }}
-
-        .section-card h3 {{
-            color: #1f77ff;
-            margin-bottom: 10px;
-        }}
-
-        .footer {{
-            text-align: center;
-            font-size: 14px;
-            color: #9ca3af;
-            margin-top: 40px;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-# APPLY BACKGROUND
-set_bg_from_local("utils/medical_bg.jpg")
+with metrics.timer("page_style_ms", page="home"):
+    apply_theme("home", dark=theme)
 
 # -------------------------------------------------
 # Sidebar
@@ -225,3 +172,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+metrics.render_debug_panel()
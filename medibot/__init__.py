@@ -0,0 +1 @@
+"""Retrieval-augmented medical Q&A used by the Medibot page and scripts."""
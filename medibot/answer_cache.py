@@ -0,0 +1,260 @@
+"""
+Two-layer answer cache for Medibot.
+
+Answers are grounded in a static textbook corpus, so repeated questions can
+reuse earlier answers:
+
+1. exact layer   - keyed on the normalised query text; a hit skips the
+                   embedding, the FAISS search and the LLM call.
+2. semantic layer - the query's MiniLM embedding (already computed for
+                   retrieval) is compared with every cached question; a
+                   cosine similarity at or above ``threshold`` reuses that
+                   answer and skips the search and the LLM call.
+
+Entries expire after ``ttl`` seconds and the least recently used entry is
+evicted beyond ``maxsize``. The cache is persisted to a directory so it
+survives restarts: answers and embeddings are saved together in one
+``answers.npz``, replaced atomically. Saves are debounced (one write per
+``save_delay`` seconds however many answers arrive) and happen outside
+the lookup lock, so they never stall other sessions' lookups.
+"""
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = "vectorstore/answer_cache"
+DEFAULT_MAXSIZE = 1000
+DEFAULT_TTL = 7 * 24 * 3600
+# Conservative: "hypertension" and "hypotension" questions embed close together.
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_SAVE_DELAY = 5.0
+CACHE_FILE = "answers.npz"
+
+CachedAnswer = namedtuple("CachedAnswer", "text sources layer")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    query = _PUNCTUATION.sub(" ", str(query).lower())
+    return _SPACES.sub(" ", query).strip()
+
+
+class AnswerCache:
+    def __init__(self, path=DEFAULT_CACHE_DIR, maxsize=DEFAULT_MAXSIZE,
+                 ttl=DEFAULT_TTL, threshold=DEFAULT_THRESHOLD, save_delay=DEFAULT_SAVE_DELAY):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.save_delay = save_delay
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        # key -> {"text", "sources", "created", "embedding"}
+        self._entries = OrderedDict()
+        self._matrix = None
+        self._matrix_keys = []
+        self._lock = threading.Lock()
+        # Serialises disk writes; never held together with ``_lock``.
+        self._save_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+        self._timer = None
+
+        if path:
+            self.load()
+            atexit.register(self.flush)
+
+    # ---------- lookup ----------
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry["created"] > self.ttl
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        self._matrix = None
+
+    def get_exact(self, query):
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry, now):
+                if entry is not None:
+                    self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return CachedAnswer(entry["text"], entry["sources"], "exact")
+
+    def get_similar(self, embedding):
+        """Best cached answer within ``threshold``; counts a miss otherwise."""
+        vector = _unit(embedding)
+        now = time.time()
+        with self._lock:
+            if self._matrix is None:
+                self._rebuild_matrix()
+            if self._matrix_keys:
+                sims = self._matrix @ vector
+                for i in np.argsort(-sims):
+                    if sims[i] < self.threshold:
+                        break
+                    key = self._matrix_keys[i]
+                    entry = self._entries.get(key)
+                    if entry is None or self._expired(entry, now):
+                        continue
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    return CachedAnswer(entry["text"], entry["sources"], "semantic")
+            self.misses += 1
+            return None
+
+    def _rebuild_matrix(self):
+        self._matrix_keys = list(self._entries)
+        if self._matrix_keys:
+            self._matrix = np.stack([self._entries[k]["embedding"] for k in self._matrix_keys])
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    # ---------- update ----------
+    def put(self, query, embedding, text, sources):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = {
+                "text": text,
+                "sources": list(sources),
+                "created": time.time(),
+                "embedding": _unit(embedding),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            flush_now = self._changed_locked()
+        if flush_now:
+            self.flush()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            flush_now = self._changed_locked()
+        if flush_now:
+            self.flush()
+
+    # ---------- persistence ----------
+    def _changed_locked(self):
+        """Schedule a save; True when the caller should write right away."""
+        if not self.path:
+            return False
+        self._generation += 1
+        if self.save_delay <= 0:
+            return True
+        if self._timer is None:
+            # Debounce: one write covers every answer added meanwhile.
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+
+    def flush(self):
+        """Write pending changes now (also runs at interpreter exit)."""
+        with self._lock:
+            self._timer = None
+            generation = self._generation
+            # Entry dicts are never mutated once stored, so a shallow copy
+            # of the items is a consistent snapshot.
+            items = list(self._entries.items())
+        with self._save_lock:
+            if generation <= self._saved_generation:
+                return  # nothing new, or a newer snapshot is already on disk
+            self._write(items)
+            self._saved_generation = generation
+
+    def _write(self, items):
+        os.makedirs(self.path, exist_ok=True)
+        records = [
+            {"query": k, "text": entry["text"], "sources": entry["sources"],
+             "created": entry["created"]}
+            for k, entry in items
+        ]
+        embeddings = (
+            np.stack([entry["embedding"] for _, entry in items])
+            if items else np.empty((0, 0), dtype=np.float32)
+        )
+        entries = np.frombuffer(json.dumps(records).encode("utf-8"), dtype=np.uint8)
+
+        # Answers and embeddings go in one file under a name unique to this
+        # writer, then replace the old file in one step: processes sharing
+        # the directory can never leave a mismatched pair behind.
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".answers-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, entries=entries, embeddings=embeddings)
+            os.replace(tmp, os.path.join(self.path, CACHE_FILE))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _read(self):
+        path = os.path.join(self.path, CACHE_FILE)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                return json.loads(data["entries"].tobytes()), data["embeddings"]
+        # Caches written before the single-file format.
+        entries_path = os.path.join(self.path, "entries.json")
+        embeddings_path = os.path.join(self.path, "embeddings.npy")
+        if not (os.path.exists(entries_path) and os.path.exists(embeddings_path)):
+            return [], []
+        with open(entries_path, encoding="utf-8") as f:
+            return json.load(f), np.load(embeddings_path)
+
+    def load(self):
+        records, embeddings = self._read()
+        if len(records) != len(embeddings):
+            # Mismatched legacy pair: start empty rather than mis-pair answers.
+            return
+
+        now = time.time()
+        with self._lock:
+            for record, embedding in zip(records, embeddings):
+                entry = {
+                    "text": record["text"],
+                    "sources": record["sources"],
+                    "created": record["created"],
+                    "embedding": embedding.astype(np.float32),
+                }
+                if not self._expired(entry, now):
+                    self._entries[record["query"]] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    # ---------- metrics ----------
+    def stats(self):
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,131 @@
+"""
+Process-wide micro-batching for Medibot query embeddings.
+
+Every Streamlit session runs in its own script thread, and each question
+used to run its own single-sentence forward pass. ``BatchingEmbedder``
+wraps an embedding model with one worker thread: ``embed_query`` enqueues
+the text and waits on a future; the worker drains whatever is queued, embeds
+it with a single ``embed_documents`` call and resolves every caller.
+
+While a batch is being computed, new queries pile up and form the next
+batch on their own. The worker only holds a batch open for ``window_ms``
+once it has recently seen concurrent queries, so a lone user pays no
+extra latency. Once ``close``d, queries are embedded inline on the
+caller's thread.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_WINDOW_MS = 3.0
+DEFAULT_MAX_BATCH = 64
+# A caller never waits forever on a stuck worker.
+DEFAULT_TIMEOUT = 60.0
+
+_STOP = object()
+
+
+class BatchingEmbedder(Embeddings):
+    def __init__(self, embedder, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH,
+                 timeout=DEFAULT_TIMEOUT):
+        self.embedder = embedder
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stopping = False
+        self._last_batch = 0
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="medibot-embedder", daemon=True)
+        self._thread.start()
+
+    # ---------- Embeddings interface ----------
+    def embed_query(self, text):
+        future = Future()
+        with self._lock:
+            # Checked under the lock close() takes, so nothing is queued
+            # behind the stop sentinel.
+            closed = self._closed
+            if not closed:
+                self._queue.put((text, future))
+        if closed:
+            return self.embedder.embed_query(text)
+        return future.result(timeout=self.timeout)
+
+    def embed_documents(self, texts):
+        # Document batches (ingestion) are already batched; no queueing.
+        return self.embedder.embed_documents(texts)
+
+    # ---------- Worker ----------
+    def _collect(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return []
+        pending = [first]
+
+        # Under concurrent load, hold the batch open briefly for stragglers.
+        deadline = time.monotonic() + (self.window if self._last_batch > 1 else 0)
+        while len(pending) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._stopping = True
+                break
+            pending.append(item)
+        return pending
+
+    def _run(self):
+        while not self._stopping:
+            pending = self._collect()
+            if not pending:
+                break
+            self._last_batch = len(pending)
+
+            try:
+                self._embed_batch(pending)
+            except Exception as exc:  # hand the failure to every waiting caller
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            with self._lock:
+                self.batches += 1
+                self.queries += len(pending)
+                self.largest_batch = max(self.largest_batch, len(pending))
+
+    def _embed_batch(self, pending):
+        texts = list(dict.fromkeys(text for text, _ in pending))
+        vectors = self.embedder.embed_documents(texts)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Embedder returned {len(vectors)} vectors for {len(texts)} texts")
+        vectors = dict(zip(texts, vectors))
+        for text, future in pending:
+            future.set_result(vectors[text])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "queries": self.queries,
+                "mean_batch": self.queries / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout=5)
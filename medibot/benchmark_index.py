@@ -0,0 +1,152 @@
+"""
+Recall-vs-latency benchmark for the FAISS index types in
+``medibot.faiss_index``.
+
+Vectors are read back from an existing vectorstore (any index type) or
+generated synthetically. Every candidate index is built from the same
+vectors and queried with the same held-out queries; recall@k is measured
+against exact flat search.
+
+    python -m medibot.benchmark_index [--db vectorstore/db_faiss] [--k 5]
+    python -m medibot.benchmark_index --synthetic 50000 --kinds flat hnsw ivf-pq
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from medibot.chain import DB_FAISS_PATH, DEFAULT_K
+from medibot.faiss_index import (
+    INDEX_KINDS,
+    build_index,
+    enable_reconstruct,
+    make_index_spec,
+    needs_training,
+    resolve_spec,
+)
+
+DEFAULT_QUERIES = 500
+DEFAULT_TRAIN_SAMPLE = 50000
+
+
+def load_stored_vectors(db_path=DB_FAISS_PATH):
+    import faiss
+
+    index = faiss.read_index(os.path.join(db_path, "index.faiss"))
+    enable_reconstruct(index)
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(n, dim=384, clusters=200, seed=0):
+    """Clustered unit vectors, roughly shaped like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=n)]
+    vectors += 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def split_queries(vectors, n_queries, seed=0):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(vectors))
+    n_queries = min(n_queries, len(vectors) // 10 or 1)
+    return vectors[order[n_queries:]], vectors[order[:n_queries]]
+
+
+def index_size(index):
+    import faiss
+
+    return int(faiss.serialize_index(index).size)
+
+
+def measure(spec, base, queries, truth, k, train_sample=DEFAULT_TRAIN_SAMPLE):
+    rng = np.random.default_rng(1)
+    sample = None
+    if needs_training(spec):
+        take = min(train_sample, len(base))
+        sample = base[rng.choice(len(base), size=take, replace=False)]
+    resolved = resolve_spec(spec, None if sample is None else len(sample))
+
+    started = time.perf_counter()
+    index = build_index(resolved, base.shape[1], sample)
+    index.add(base)
+    build_s = time.perf_counter() - started
+
+    # One query at a time, as the app issues them.
+    latencies = np.empty(len(queries))
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        t0 = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies[i] = time.perf_counter() - t0
+        found[i] = ids[0]
+
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return {
+        "kind": resolved["kind"],
+        "params": resolved["params"],
+        f"recall@{k}": hits / truth.size,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "size_mb": index_size(index) / 2 ** 20,
+        "build_s": build_s,
+    }
+
+
+def run(vectors, kinds=INDEX_KINDS, k=DEFAULT_K, n_queries=DEFAULT_QUERIES, **params):
+    import faiss
+
+    base, queries = split_queries(np.ascontiguousarray(vectors, dtype=np.float32), n_queries)
+    exact = faiss.IndexFlatL2(base.shape[1])
+    exact.add(base)
+    _, truth = exact.search(queries, k)
+
+    return [measure(make_index_spec(kind, **params), base, queries, truth, k)
+            for kind in kinds]
+
+
+def print_table(results, k):
+    key = f"recall@{k}"
+    print(f"{'index':<10} {key:>9} {'p50 ms':>8} {'p99 ms':>8} {'size MB':>9} {'build s':>8}")
+    for r in results:
+        print(f"{r['kind']:<10} {r[key]:>9.3f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+              f"{r['size_mb']:>9.1f} {r['build_s']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare FAISS index types.")
+    parser.add_argument("--db", default=DB_FAISS_PATH)
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Use N synthetic vectors instead of the vectorstore")
+    parser.add_argument("--kinds", nargs="+", choices=INDEX_KINDS, default=list(INDEX_KINDS))
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, default=None)
+    parser.add_argument("--pq-m", type=int, default=None)
+    parser.add_argument("--hnsw-m", type=int, default=None)
+    parser.add_argument("--ef-search", type=int, default=None)
+    parser.add_argument("--json", default=None, help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+    else:
+        vectors = load_stored_vectors(args.db)
+    print(f"{len(vectors)} vectors, dim {vectors.shape[1]}, {args.queries} queries")
+
+    results = run(vectors, args.kinds, args.k, args.queries, nlist=args.nlist,
+                  nprobe=args.nprobe, pq_m=args.pq_m, hnsw_m=args.hnsw_m,
+                  ef_search=args.ef_search)
+    print_table(results, args.k)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Offline latency / throughput benchmark for the Medibot RAG path.
+
+Needs no network: a fixture vectorstore is built from the first pages of
+each PDF in DATA_PATH with ``create_memory_for_llm``'s chunking, queries
+are embedded with a deterministic hashing embedder (or a local backend from
+``medibot.embeddings``) and ``ChatGroq`` talks to
+``medibot.fake_llm_server`` through ``GROQ_API_BASE``. The same
+``MedibotChain`` the page uses (hybrid retrieval, context compression)
+answers a query set replayed at each requested concurrency.
+
+Reported per run: p50/p95/p99/mean of every stage the chain times (embed,
+search, bm25, fuse, compress, prompt, first_token, llm, total) plus
+``render``, the time to format the answer and sources into the page's
+HTML cards (Streamlit itself is not measured); throughput in queries/s;
+current and peak RSS. Results are written as JSON for comparison in CI.
+
+    python -m medibot.benchmark_rag --pages 40 --concurrency 1 4 16 \\
+        --token-delay-ms 20 --out bench_rag.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from medibot.batch_embedder import BatchingEmbedder
+from medibot.chain import MedibotChain
+from medibot.context import ContextCompressor
+from medibot.create_memory_for_llm import DATA_PATH, ingest, list_pdf_files
+from medibot.embeddings import BACKENDS, load_embedding_model
+from medibot.faiss_index import load_faiss
+from medibot.fake_llm_server import (
+    DEFAULT_FIRST_TOKEN_MS,
+    DEFAULT_TOKEN_DELAY_MS,
+    DEFAULT_TOKENS,
+    FakeLLMServer,
+)
+from medibot.lexical_index import load_lexical_index, tokenize
+
+DEFAULT_PAGES = 40
+DEFAULT_CONCURRENCY = (1, 4, 16)
+
+DEFAULT_QUERIES = [
+    "What are the symptoms of type 2 diabetes?",
+    "How is community-acquired pneumonia treated?",
+    "What causes atrial fibrillation?",
+    "First-line treatment for hypertension",
+    "Signs of acute myocardial infarction",
+    "How is asthma diagnosed?",
+    "What is the treatment for peptic ulcer disease?",
+    "Complications of chronic kidney disease",
+    "How is tuberculosis transmitted?",
+    "Management of diabetic ketoacidosis",
+    "What are the side effects of corticosteroids?",
+    "Symptoms of hypothyroidism",
+    "What is Guillain-Barré syndrome?",
+    "Causes of iron deficiency anemia",
+    "How is migraine treated?",
+    "What is the treatment for urinary tract infection?",
+]
+
+STAGES = ("embed", "search", "bm25", "fuse", "compress", "prompt",
+          "first_token", "llm", "render", "total")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings (feature hashing), for offline runs."""
+
+    def __init__(self, size=384):
+        self.size = size
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.size] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+# -------------------------------------------------
+# Fixture
+# -------------------------------------------------
+def make_fixture_pdfs(out_dir, pages=DEFAULT_PAGES, data_path=DATA_PATH):
+    """Copy the first ``pages`` pages of each source PDF into ``out_dir``."""
+    from pypdf import PdfReader, PdfWriter
+
+    os.makedirs(out_dir, exist_ok=True)
+    for path in list_pdf_files(data_path):
+        target = os.path.join(out_dir, os.path.basename(path))
+        if os.path.exists(target):
+            continue
+        reader = PdfReader(path)
+        writer = PdfWriter()
+        for page in reader.pages[:pages]:
+            writer.add_page(page)
+        with open(target, "wb") as f:
+            writer.write(f)
+    return out_dir
+
+
+# -------------------------------------------------
+# Measurement
+# -------------------------------------------------
+def rss_mb():
+    """Current resident set size (Linux), else None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if platform.system() == "Darwin" else peak / 2 ** 10
+
+
+def render_html(text, sources):
+    # Same markup the page emits for an answer and its sources.
+    cards = [f"<div class='card'><b>Medibot</b><br>{text}</div>"]
+    cards += [f"<div class='card'><b>Source {i}</b><br>{src}</div>"
+              for i, src in enumerate(sources, 1)]
+    return "".join(cards)
+
+
+def answer_one(chain, query):
+    answer = chain.stream(query)
+    text = "".join(answer.tokens)
+    started = time.perf_counter()
+    render_html(text, answer.sources)
+    timings = dict(answer.timings)
+    timings["render"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def summarize(samples):
+    stages = {}
+    for stage in STAGES:
+        values = np.array([s[stage] for s in samples if stage in s])
+        if not len(values):
+            continue
+        stages[stage] = {
+            "mean": float(values.mean()),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "p99": float(np.percentile(values, 99)),
+        }
+    return stages
+
+
+def replay(chain, queries, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda q: answer_one(chain, q), queries))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "wall_s": wall,
+        "throughput_qps": len(queries) / wall,
+        "stages_ms": summarize(samples),
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(workdir, pages=DEFAULT_PAGES, concurrency=DEFAULT_CONCURRENCY, repeat=4,
+        queries=None, embeddings="hashing", hybrid=True, compress=True,
+        batch_window_ms=3.0, tokens=DEFAULT_TOKENS, token_delay_ms=DEFAULT_TOKEN_DELAY_MS,
+        first_token_ms=DEFAULT_FIRST_TOKEN_MS, workers=None):
+    queries = list(queries or DEFAULT_QUERIES) * repeat
+    data_dir = make_fixture_pdfs(os.path.join(workdir, "data"), pages)
+    db_path = os.path.join(workdir, "db_faiss")
+    embedder = HashingEmbeddings() if embeddings == "hashing" else load_embedding_model(embeddings)
+
+    report = {
+        "config": {
+            "pages_per_pdf": pages, "embeddings": embeddings, "hybrid": hybrid,
+            "compress": compress, "batch_window_ms": batch_window_ms, "tokens": tokens,
+            "token_delay_ms": token_delay_ms, "first_token_ms": first_token_ms,
+        },
+        "environment": {
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "rss_start_mb": rss_mb(),
+    }
+
+    started = time.perf_counter()
+    ingest(data_dir, db_path, workers=workers, embedding_model=embedder, backend=embeddings)
+    report["ingest_s"] = time.perf_counter() - started
+
+    server = FakeLLMServer(tokens=tokens, token_delay_ms=token_delay_ms,
+                           first_token_ms=first_token_ms).start()
+    os.environ["GROQ_API_BASE"] = server.base_url
+    batched = BatchingEmbedder(embedder, window_ms=batch_window_ms) if batch_window_ms > 0 else None
+    try:
+        started = time.perf_counter()
+        vectorstore = load_faiss(db_path, batched or embedder, read_only=True)
+        chain = MedibotChain(
+            vectorstore, api_key="offline",
+            lexical=load_lexical_index(db_path) if hybrid else None,
+            compressor=ContextCompressor() if compress else None,
+        )
+        report["load_s"] = time.perf_counter() - started
+        report["chunks"] = vectorstore.index.ntotal
+        report["rss_loaded_mb"] = rss_mb()
+
+        answer_one(chain, queries[0])  # warm-up: connections, lazy imports
+        report["runs"] = [replay(chain, queries, c) for c in concurrency]
+        chain.close()
+    finally:
+        if batched is not None:
+            batched.close()
+        server.stop()
+    return report
+
+
+def print_report(report):
+    print(f"{report['chunks']} chunks, ingest {report['ingest_s']:.1f}s, "
+          f"load {report['load_s'] * 1000:.0f} ms, RSS {report['rss_loaded_mb']:.0f} MB")
+    print(f"{'conc':>4} {'qps':>7} {'embed':>7} {'search':>7} {'prompt':>7} "
+          f"{'ttft':>7} {'llm':>7} {'total p50':>10} {'total p99':>10} {'peak MB':>8}")
+    for run in report["runs"]:
+        s = run["stages_ms"]
+        p50 = lambda stage: s.get(stage, {}).get("p50", 0.0)
+        print(f"{run['concurrency']:>4} {run['throughput_qps']:>7.2f} {p50('embed'):>7.2f} "
+              f"{p50('search'):>7.2f} {p50('prompt'):>7.2f} {p50('first_token'):>7.0f} "
+              f"{p50('llm'):>7.0f} {p50('total'):>10.0f} {s['total']['p99']:>10.0f} "
+              f"{run['peak_rss_mb']:>8.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Medibot RAG benchmark.")
+    parser.add_argument("--workdir", default=None,
+                        help="Fixture directory (reused between runs; default: a temp dir)")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Pages per source PDF")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--repeat", type=int, default=4, help="Passes over the query set per run")
+    parser.add_argument("--queries", default=None, help="File with one query per line")
+    parser.add_argument("--embeddings", choices=("hashing",) + BACKENDS, default="hashing")
+    parser.add_argument("--no-hybrid", action="store_true")
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--batch-window-ms", type=float, default=3.0)
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS)
+    parser.add_argument("--token-delay-ms", type=float, default=DEFAULT_TOKEN_DELAY_MS)
+    parser.add_argument("--first-token-ms", type=float, default=DEFAULT_FIRST_TOKEN_MS)
+    parser.add_argument("--workers", type=int, default=None, help="PDF parser processes")
+    parser.add_argument("--out", default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    queries = None
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="medibot-bench-")
+    report = run(
+        workdir, pages=args.pages, concurrency=args.concurrency, repeat=args.repeat,
+        queries=queries, embeddings=args.embeddings, hybrid=not args.no_hybrid,
+        compress=not args.no_compress, batch_window_ms=args.batch_window_ms,
+        tokens=args.tokens, token_delay_ms=args.token_delay_ms,
+        first_token_ms=args.first_token_ms, workers=args.workers,
+    )
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
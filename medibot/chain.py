@@ -0,0 +1,297 @@
+"""
+Process-wide Medibot QA chain.
+
+The Groq client, its pooled keep-alive HTTP connection, the prompt and the
+``RetrievalQA`` chain are built once per process and shared by every
+Streamlit session; each question only pays for embedding, FAISS search
+and the LLM call. ``ask`` runs those stages separately so each one can be
+timed. ``stream`` returns the retrieved sources straight away and yields
+the answer token by token as the model produces it. With an
+``AnswerCache`` attached, repeated questions skip the LLM call (and, on an
+exact match, retrieval too).
+
+With a ``LexicalIndex`` attached, retrieval is hybrid: BM25 runs on a
+worker thread while the query is embedded and searched in FAISS, and the
+two candidate lists are merged with reciprocal-rank fusion. Exact terms
+are then found lexically, so fewer (``HYBRID_K``) chunks go into the
+prompt.
+
+With a ``ContextCompressor`` attached, retrieval fetches extra candidates
+and the compressor drops near-duplicates, merges neighbouring chunks and
+trims the context to a token budget before it reaches the prompt.
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.prompts import PromptTemplate
+
+from mediguide import metrics
+from medibot.faiss_index import enable_reconstruct
+from medibot.lexical_index import reciprocal_rank_fusion
+
+DB_FAISS_PATH = "vectorstore/db_faiss"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+LLM_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_K = 5
+HYBRID_K = 3
+CANDIDATE_K = 20
+
+PROMPT_TEMPLATE = """
+Answer the medical question using ONLY the context below.
+If the answer is not present, say "I don't know".
+
+Context:
+{context}
+
+Question:
+{question}
+
+Answer:
+"""
+
+# ``cached`` is None, "exact" or "semantic" (see medibot.answer_cache).
+Answer = namedtuple("Answer", "text sources timings cached", defaults=(None,))
+StreamingAnswer = namedtuple("StreamingAnswer", "sources tokens timings cached", defaults=(None,))
+
+
+# -------------------------------------------------
+# Timing
+# -------------------------------------------------
+def record(timings, name, elapsed_ms):
+    """Store a stage time on the answer and in the process-wide metrics."""
+    timings[name] = elapsed_ms
+    metrics.observe("medibot_stage_ms", elapsed_ms, stage=name)
+
+
+@contextmanager
+def stage(timings, name):
+    """Record the wall time of the enclosed block in ``timings[name]`` (ms)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(timings, name, (time.perf_counter() - start) * 1000)
+
+
+# -------------------------------------------------
+# Builders
+# -------------------------------------------------
+def get_prompt_template():
+    return PromptTemplate(template=PROMPT_TEMPLATE, input_variables=["context", "question"])
+
+
+def make_http_client(max_connections=20, keepalive=10, timeout=60.0):
+    """One pooled, keep-alive client so answers reuse warm TLS connections."""
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=keepalive,
+            keepalive_expiry=120,
+        ),
+        timeout=timeout,
+    )
+
+
+def load_llm(api_key, http_client=None):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        temperature=0.5,
+        model_name=LLM_MODEL,
+        api_key=api_key,
+        http_client=http_client,
+    )
+
+
+def build_qa_chain(vectorstore, llm, k=DEFAULT_K):
+    # langchain.chains pulls in langsmith (~0.4 s); only pay for it when a
+    # chain is built, not when the page imports this module.
+    from langchain.chains import RetrievalQA
+
+    return RetrievalQA.from_chain_type(
+        llm=llm,
+        chain_type="stuff",
+        retriever=vectorstore.as_retriever(search_kwargs={"k": k}),
+        return_source_documents=True,
+        chain_type_kwargs={"prompt": get_prompt_template()},
+    )
+
+
+class MedibotChain:
+    """Everything needed to answer a question, built once and reused."""
+
+    def __init__(self, vectorstore, api_key=None, k=None, http_client=None,
+                 cache=None, lexical=None, candidates=CANDIDATE_K, compressor=None):
+        self.vectorstore = vectorstore
+        self.k = k or (HYBRID_K if lexical is not None else DEFAULT_K)
+        self.cache = cache
+        self.lexical = lexical
+        self.compressor = compressor
+        self.fetch_k = compressor.fetch_k(self.k) if compressor is not None else self.k
+        self.candidates = max(candidates, self.fetch_k)
+        self.executor = None
+        if lexical is not None:
+            self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="medibot-bm25")
+        self._row_of = None
+        if compressor is not None:
+            enable_reconstruct(vectorstore.index)
+            # The chunk store resolves ids itself; the pickled docstore needs a map.
+            self._row_of = getattr(vectorstore.docstore, "row_of", None) or {
+                doc_id: row for row, doc_id in vectorstore.index_to_docstore_id.items()
+            }.__getitem__
+        self.timings = {}
+        with stage(self.timings, "build"):
+            self.http_client = http_client or make_http_client()
+            self.llm = load_llm(api_key or os.environ.get("GROQ_API_KEY"), self.http_client)
+            self.qa_chain = build_qa_chain(vectorstore, self.llm, k=self.k)
+            self.prompt = get_prompt_template()
+
+    def embed(self, query, timings):
+        with stage(timings, "embed"):
+            return self.vectorstore.embeddings.embed_query(query)
+
+    def lexical_search(self, query, timings):
+        with stage(timings, "bm25"):
+            return [doc_id for doc_id, _ in self.lexical.search(query, self.candidates)]
+
+    def vector_search(self, vector, k):
+        _, rows = self.vectorstore.index.search(np.asarray([vector], dtype=np.float32), k)
+        mapping = self.vectorstore.index_to_docstore_id
+        return [mapping[int(row)] for row in rows[0] if row != -1]
+
+    def stored_vectors(self, ids):
+        rows = np.fromiter((self._row_of(doc_id) for doc_id in ids), dtype=np.int64)
+        return self.vectorstore.index.reconstruct_batch(rows)
+
+    def retrieve(self, query, timings, vector=None):
+        if self.lexical is None and self.compressor is None:
+            if vector is None:
+                vector = self.embed(query, timings)
+            with stage(timings, "search"):
+                docs = self.vectorstore.similarity_search_by_vector(vector, k=self.k)
+            return docs
+
+        lexical = None
+        if self.lexical is not None:
+            lexical = self.executor.submit(self.lexical_search, query, timings)
+        if vector is None:
+            vector = self.embed(query, timings)
+        with stage(timings, "search"):
+            ids = self.vector_search(vector, self.candidates if lexical else self.fetch_k)
+        if lexical is not None:
+            sparse = lexical.result()
+            with stage(timings, "fuse"):
+                ids = reciprocal_rank_fusion([ids, sparse], self.fetch_k)
+        docs = [self.vectorstore.docstore.search(doc_id) for doc_id in ids]
+
+        if self.compressor is not None:
+            with stage(timings, "compress"):
+                docs = self.compressor.compress(docs, ids, self.stored_vectors(ids), self.k)
+        return docs
+
+    def lookup(self, query, timings):
+        """``(cached answer or None, query embedding or None)``."""
+        hit, vector = self._lookup(query, timings)
+        metrics.inc("medibot_questions_total", cached=hit.layer if hit is not None else "none")
+        return hit, vector
+
+    def _lookup(self, query, timings):
+        if self.cache is not None:
+            with stage(timings, "cache"):
+                hit = self.cache.get_exact(query)
+            if hit is not None:
+                return hit, None
+
+        vector = self.embed(query, timings)
+        if self.cache is not None:
+            with stage(timings, "cache_semantic"):
+                hit = self.cache.get_similar(vector)
+            if hit is not None:
+                return hit, vector
+        return None, vector
+
+    def ask(self, query):
+        timings = {}
+        with stage(timings, "total"):
+            hit, vector = self.lookup(query, timings)
+            if hit is None:
+                docs = self.retrieve(query, timings, vector)
+                with stage(timings, "llm"):
+                    result = self.qa_chain.combine_documents_chain.invoke(
+                        {"input_documents": docs, "question": query}
+                    )
+                text = result.get("output_text", "No response generated.")
+                sources = [doc.page_content for doc in docs]
+                if self.cache is not None:
+                    self.cache.put(query, vector, text, sources)
+
+        if hit is not None:
+            return Answer(hit.text, hit.sources, timings, cached=hit.layer)
+        return Answer(text, sources, timings)
+
+    def build_prompt(self, docs, query):
+        # Same layout the "stuff" chain produces.
+        context = "\n\n".join(doc.page_content for doc in docs)
+        return self.prompt.format(context=context, question=query)
+
+    def _stream_tokens(self, prompt, timings, started, on_complete=None):
+        first = True
+        parts = []
+        with stage(timings, "llm"):
+            for chunk in self.llm.stream(prompt):
+                if first:
+                    record(timings, "first_token", (time.perf_counter() - started) * 1000)
+                    first = False
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        record(timings, "total", (time.perf_counter() - started) * 1000)
+        if on_complete is not None:
+            on_complete("".join(parts))
+
+    def _replay(self, text, timings, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        timings["first_token"] = elapsed
+        record(timings, "total", elapsed)
+        yield text
+
+    def stream(self, query):
+        """Retrieve now; return the sources and a generator of answer tokens."""
+        started = time.perf_counter()
+        timings = {}
+        hit, vector = self.lookup(query, timings)
+        if hit is not None:
+            return StreamingAnswer(
+                sources=hit.sources,
+                tokens=self._replay(hit.text, timings, started),
+                timings=timings,
+                cached=hit.layer,
+            )
+
+        docs = self.retrieve(query, timings, vector)
+        sources = [doc.page_content for doc in docs]
+        with stage(timings, "prompt"):
+            prompt = self.build_prompt(docs, query)
+
+        on_complete = None
+        if self.cache is not None:
+            def on_complete(text):
+                if text:
+                    self.cache.put(query, vector, text, sources)
+
+        return StreamingAnswer(
+            sources=sources,
+            tokens=self._stream_tokens(prompt, timings, started, on_complete),
+            timings=timings,
+        )
+
+    def close(self):
+        self.http_client.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
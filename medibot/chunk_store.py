@@ -0,0 +1,124 @@
+"""
+Memory-mapped chunk store for serving the Medibot vectorstore without pickle.
+
+``FAISS.load_local`` unpickles every chunk's text and metadata into each
+process. The chunk store keeps them in a ``mediguide.bundle`` next to the
+index instead, one row per FAISS row:
+
+    text       strings   chunk text
+    metadata   strings   JSON-encoded chunk metadata
+    doc_ids    strings   docstore id
+    id_order   int64     rows sorted by doc id (for id -> row lookups)
+
+A FAISS hit is resolved by offset, so only the k retrieved chunks are ever
+decoded. Pages come from the shared OS cache, so cold start and resident
+memory stay flat however large the corpus grows, and any number of worker
+processes can read one store safely.
+
+The store is read-only: ingestion still updates the pickled docstore and
+rewrites the chunk store at the end of every run.
+"""
+import bisect
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+from mediguide.bundle import BundleError, BundleWriter, load_bundle
+
+CHUNK_STORE_DIR_NAME = "chunks"
+BUNDLE_KIND = "chunks"
+
+
+def chunk_store_path(db_path):
+    return os.path.join(db_path, CHUNK_STORE_DIR_NAME)
+
+
+def build_chunk_store(db, db_path, version="1"):
+    """Write every chunk of a LangChain FAISS store, in FAISS row order."""
+    doc_ids = [db.index_to_docstore_id[i] for i in range(len(db.index_to_docstore_id))]
+    docs = [db.docstore.search(doc_id) for doc_id in doc_ids]
+    with BundleWriter(chunk_store_path(db_path), kind=BUNDLE_KIND, version=version,
+                      meta={"ntotal": len(doc_ids)}) as writer:
+        writer.add_strings("text", (doc.page_content for doc in docs))
+        writer.add_strings("metadata", (json.dumps(doc.metadata) for doc in docs))
+        writer.add_strings("doc_ids", doc_ids)
+        writer.add_array("id_order", np.argsort(np.array(doc_ids, dtype=object), kind="stable")
+                         .astype(np.int64))
+    return len(doc_ids)
+
+
+class _SortedIds:
+    # Sequence view of doc ids in sorted order, for bisect.
+    def __init__(self, doc_ids, order):
+        self.doc_ids = doc_ids
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.doc_ids[int(self.order[i])]
+
+
+class RowIds(Mapping):
+    """``index_to_docstore_id`` for LangChain, read from the store instead of a dict."""
+
+    def __init__(self, doc_ids):
+        self.doc_ids = doc_ids
+
+    def __getitem__(self, row):
+        if not 0 <= row < len(self.doc_ids):
+            raise KeyError(row)
+        return self.doc_ids[row]
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def __iter__(self):
+        return iter(range(len(self.doc_ids)))
+
+
+class ChunkStore(Docstore):
+    def __init__(self, bundle):
+        self.text = bundle["text"]
+        self.metadata = bundle["metadata"]
+        self.doc_ids = bundle["doc_ids"]
+        self._sorted = _SortedIds(self.doc_ids, bundle["id_order"])
+
+    @classmethod
+    def load(cls, db_path):
+        return cls(load_bundle(chunk_store_path(db_path), kind=BUNDLE_KIND))
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def row_of(self, doc_id):
+        i = bisect.bisect_left(self._sorted, doc_id)
+        if i == len(self._sorted) or self._sorted[i] != doc_id:
+            raise KeyError(doc_id)
+        return int(self._sorted.order[i])
+
+    def document(self, row):
+        return Document(id=self.doc_ids[row], page_content=self.text[row],
+                        metadata=json.loads(self.metadata[row]))
+
+    def search(self, search):
+        try:
+            return self.document(self.row_of(search))
+        except KeyError:
+            return f"ID {search} not found."
+
+
+def load_chunk_store(db_path, ntotal=None):
+    """The store, or None if it is missing or does not match an index of ``ntotal`` rows."""
+    try:
+        bundle = load_bundle(chunk_store_path(db_path), kind=BUNDLE_KIND)
+    except BundleError:
+        return None
+    if ntotal is not None and bundle.meta.get("ntotal") != ntotal:
+        return None
+    return ChunkStore(bundle)
@@ -0,0 +1,176 @@
+"""
+Post-retrieval context compression for Medibot.
+
+Retrieval hands back a few more candidates than the prompt needs; before
+they are stuffed into the prompt ``ContextCompressor``:
+
+1. drops near-duplicates, walking candidates in retrieval order and
+   skipping any whose embedding is within ``duplicate_threshold`` cosine
+   of one already kept (the two textbooks often say the same thing),
+2. merges chunks that sit next to each other on the same page back into
+   one passage, removing the splitter's overlap (cut at the ``start_index``
+   recorded at ingestion; older stores fall back to a conservative text
+   match),
+3. trims the result to a token budget, cutting the last passage at a word
+   boundary.
+
+Embeddings come from the FAISS index, so no extra model call is made.
+"""
+import numpy as np
+from langchain_core.documents import Document
+
+DEFAULT_TOKEN_BUDGET = 1000
+DUPLICATE_THRESHOLD = 0.9
+FETCH_FACTOR = 2
+CHARS_PER_TOKEN = 4
+MIN_TAIL_TOKENS = 32
+MAX_OVERLAP = 100
+# Without offsets, shorter matches are coincidences ("cause" + "severe").
+MIN_OVERLAP = 20
+
+
+def estimate_tokens(text):
+    # Llama tokenizers average ~4 characters per token on English prose.
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# -------------------------------------------------
+# Near-duplicates
+# -------------------------------------------------
+def dedupe(vectors, k, threshold=DUPLICATE_THRESHOLD):
+    """Positions of the first ``k`` rows that are not near-copies of an earlier kept row."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not len(vectors):
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.maximum(norms, 1e-12)
+    similarity = unit @ unit.T
+
+    kept = []
+    for i in range(len(unit)):
+        if kept and similarity[i, kept].max() >= threshold:
+            continue
+        kept.append(i)
+        if len(kept) == k:
+            break
+    return kept
+
+
+# -------------------------------------------------
+# Adjacent chunks
+# -------------------------------------------------
+def chunk_position(doc_id):
+    """``(page key, chunk number)`` from ids made by ``create_memory_for_llm.chunk_ids``."""
+    prefix, _, number = str(doc_id).rpartition("-")
+    if not prefix or not number.isdigit():
+        return None
+    return prefix, int(number)
+
+
+def join_overlapping(first, second, max_overlap=MAX_OVERLAP, min_overlap=MIN_OVERLAP):
+    """Concatenate two consecutive chunks, dropping the text they share.
+
+    Only a shared run of at least ``min_overlap`` characters that starts on
+    a word boundary in ``first`` counts as overlap; anything else is joined
+    with a newline rather than risk fusing two words.
+    """
+    for size in range(min(max_overlap, len(first), len(second)), min_overlap - 1, -1):
+        if first.endswith(second[:size]):
+            boundary = len(first) - size
+            if boundary == 0 or first[boundary - 1].isspace():
+                return first + second[size:]
+    return first + "\n" + second
+
+
+def join_at_offset(first, first_end, second, second_start):
+    """Join using the chunks' offsets in the page; ``first`` ends at ``first_end``."""
+    overlap = first_end - second_start
+    if overlap <= 0:
+        return first + "\n" + second
+    return first + second[overlap:]
+
+
+def merge_adjacent(docs, ids):
+    """Fold runs of consecutive chunks from one page into a single passage.
+
+    The passage takes the place of the best-ranked chunk in the run.
+    """
+    by_page = {}
+    for rank, doc_id in enumerate(ids):
+        pos = chunk_position(doc_id)
+        if pos is not None:
+            by_page.setdefault(pos[0], []).append((pos[1], rank))
+
+    runs = {}  # best rank -> member ranks in page order
+    for members in by_page.values():
+        members.sort()
+        run = [members[0]]
+        for member in members[1:] + [None]:
+            if member is not None and member[0] == run[-1][0] + 1:
+                run.append(member)
+                continue
+            if len(run) > 1:
+                runs[min(rank for _, rank in run)] = [rank for _, rank in run]
+            run = [member]
+
+    absorbed = {rank for run in runs.values() for rank in run}
+    merged = []
+    for rank, doc in enumerate(docs):
+        if rank in runs:
+            members = runs[rank]
+            head = docs[members[0]]
+            text = head.page_content
+            end = _end_offset(head)
+            for member in members[1:]:
+                doc = docs[member]
+                start = doc.metadata.get("start_index")
+                if end is not None and start is not None:
+                    text = join_at_offset(text, end, doc.page_content, start)
+                else:
+                    text = join_overlapping(text, doc.page_content)
+                end = _end_offset(doc)
+            merged.append(Document(page_content=text, metadata=docs[members[0]].metadata))
+        elif rank not in absorbed:
+            merged.append(doc)
+    return merged
+
+
+def _end_offset(doc):
+    start = doc.metadata.get("start_index")
+    return None if start is None else start + len(doc.page_content)
+
+
+# -------------------------------------------------
+# Token budget
+# -------------------------------------------------
+def trim_to_budget(docs, budget=DEFAULT_TOKEN_BUDGET):
+    kept = []
+    remaining = budget
+    for doc in docs:
+        tokens = estimate_tokens(doc.page_content)
+        if tokens <= remaining:
+            kept.append(doc)
+            remaining -= tokens
+            continue
+        if remaining >= MIN_TAIL_TOKENS:
+            cut = doc.page_content[:remaining * CHARS_PER_TOKEN].rsplit(None, 1)[0]
+            kept.append(Document(page_content=cut + " …", metadata=doc.metadata))
+        break
+    return kept
+
+
+class ContextCompressor:
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET,
+                 duplicate_threshold=DUPLICATE_THRESHOLD, fetch_factor=FETCH_FACTOR):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.fetch_factor = fetch_factor
+
+    def fetch_k(self, k):
+        """How many candidates to retrieve so ``k`` survive deduplication."""
+        return k * self.fetch_factor
+
+    def compress(self, docs, ids, vectors, k):
+        keep = dedupe(vectors, k, self.duplicate_threshold)
+        docs = merge_adjacent([docs[i] for i in keep], [ids[i] for i in keep])
+        return trim_to_budget(docs, self.token_budget)
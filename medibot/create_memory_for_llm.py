@@ -1,43 +1,331 @@
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+"""
+Build or update the Medibot FAISS vectorstore from the PDFs in DATA_PATH.
+
+Ingestion is incremental. A manifest next to the index records a content
+hash for every PDF and every page, plus the ids of the chunks each page
+produced. On each run:
+
+- unchanged files are skipped without being parsed,
+- in changed files only new or edited pages are chunked and embedded,
+- chunks of edited pages, removed pages and deleted files are dropped
+  from the index.
+
+Changing the chunking, the embedding model or backend (``--embeddings``,
+see ``medibot.embeddings``) or the index type triggers a
+full rebuild, as does ``--full``. HNSW and IVF indexes cannot drop
+vectors in a way LangChain's id mapping follows, so edited or deleted
+files also rebuild them.
+
+After every run the BM25 index used for hybrid retrieval
+(``medibot.lexical_index``) and the memory-mapped chunk store the app
+serves from (``medibot.chunk_store``) are rebuilt from the FAISS docstore.
+
+``--index`` picks the FAISS index type (flat, hnsw, ivf-flat, ivf-pq, sq8;
+see ``medibot.faiss_index``). Its build and search parameters are written
+to ``index_meta.json`` next to the index; search-time knobs (``--nprobe``,
+``--ef-search``) can be changed without rebuilding.
+
+Changed files flow through the streaming stages in
+``medibot.ingest_pipeline``: pages are parsed in a process pool, chunked as
+they arrive, embedded in fixed-size batches and appended to the index, so
+memory stays bounded and progress is reported in pages/s and chunks/s.
 
+    python -m medibot.create_memory_for_llm [--full] [--workers N] [--batch-size N]
+                                            [--index KIND] [--nlist N] [--nprobe N] ...
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv, find_dotenv
+
+from medibot.embeddings import BACKENDS, DEFAULT_BACKEND, load_embedding_model, resolve_backend
+from medibot.faiss_index import (
+    DEFAULT_PARAMS,
+    INDEX_KINDS,
+    SEARCH_PARAMS,
+    build_config,
+    load_faiss,
+    load_index_meta,
+    make_index_spec,
+    save_index_meta,
+    supports_removal,
+)
+from medibot.ingest_pipeline import (
+    DEFAULT_BATCH_SIZE,
+    FaissWriter,
+    IngestProgress,
+    iter_batches,
+    iter_pages,
+    tune_threads,
+)
+from medibot.chunk_store import build_chunk_store, chunk_store_path
+from medibot.lexical_index import build_from_vectorstore, lexical_path
+
 load_dotenv(find_dotenv())
 
-# Step 1: Load raw PDF(s)
-DATA_PATH="data/medibot data"
-def load_pdf_files(data):
-    loader = DirectoryLoader(data,
-                             glob='*.pdf',
-                             loader_cls=PyPDFLoader)
-    
-    documents=loader.load()
-    return documents
+DATA_PATH = "data/medibot data"
+DB_FAISS_PATH = "vectorstore/db_faiss"
+MANIFEST_NAME = "ingest_manifest.json"
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+
+# Step 1: Hashing and manifest
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def ingest_config(index_spec=None, backend=DEFAULT_BACKEND):
+    config = {
+        "embedding_model": EMBEDDING_MODEL,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+    if backend != DEFAULT_BACKEND:
+        config["embedding_backend"] = backend
+    if index_spec is not None and index_spec["kind"] != "flat":
+        config["index"] = build_config(index_spec)
+    return config
+
+
+def load_manifest(db_path=DB_FAISS_PATH):
+    path = os.path.join(db_path, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, db_path=DB_FAISS_PATH):
+    os.makedirs(db_path, exist_ok=True)
+    path = os.path.join(db_path, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+# Step 2: Find PDFs
+def list_pdf_files(data=DATA_PATH):
+    return sorted(glob.glob(os.path.join(data, "*.pdf")))
+
+
+# Step 3: Create Chunks
+def get_text_splitter():
+    # start_index lets medibot.context cut the exact overlap when it merges
+    # neighbouring chunks.
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE,
+                                          chunk_overlap=CHUNK_OVERLAP,
+                                          add_start_index=True)
 
-# Step 2: Create Chunks
-documents=load_pdf_files(data=DATA_PATH)
-print("Length of PDF pages: ", len(documents))
 
 def create_chunks(extracted_data):
-    text_splitter=RecursiveCharacterTextSplitter(chunk_size=500,
-                                                 chunk_overlap=50)
-    text_chunks=text_splitter.split_documents(extracted_data)
-    return text_chunks
+    return get_text_splitter().split_documents(extracted_data)
+
+
+def chunk_ids(source, page_number, page_hash, count):
+    prefix = sha256_text(f"{source}|{page_number}|{page_hash}")[:24]
+    return [f"{prefix}-{i}" for i in range(count)]
+
+
+# Step 4: Embedding model
+def get_embedding_model(batch_size=64, backend=None):
+    return load_embedding_model(backend, batch_size=batch_size)
+
+
+# Step 5: Work out what changed
+class IngestPlan:
+    """Compares parsed pages against the manifest while they stream past."""
+
+    def __init__(self, old_files, data_path):
+        self.old_files = old_files
+        self.data_path = data_path
+        self.new_files = {}
+        self.to_drop = []
+        self.seen_pages = {}
+
+    def key(self, path):
+        return os.path.relpath(path, self.data_path)
+
+    def start_file(self, path, file_hash):
+        self.new_files[self.key(path)] = {"sha256": file_hash, "pages": {}}
+        self.seen_pages[self.key(path)] = set()
+
+    def changed_chunks(self, pages, splitter, progress):
+        """Yield ``(chunk, id)`` for every new or edited page."""
+        for page in pages:
+            progress.add(pages=1)
+            key = self.key(page.metadata["source"])
+            number = str(page.metadata.get("page", 0))
+            page_hash = sha256_text(page.page_content)
+            self.seen_pages[key].add(number)
+
+            old = self.old_files.get(key, {}).get("pages", {}).get(number)
+            if old is not None and old["hash"] == page_hash:
+                self.new_files[key]["pages"][number] = old
+                continue
+
+            if old is not None:
+                self.to_drop.extend(old["chunk_ids"])
+            chunks = splitter.split_documents([page])
+            ids = chunk_ids(key, number, page_hash, len(chunks))
+            self.new_files[key]["pages"][number] = {"hash": page_hash, "chunk_ids": ids}
+            yield from zip(chunks, ids)
+
+    def finish(self):
+        """Collect chunks of removed pages and deleted files."""
+        for key, old_entry in self.old_files.items():
+            seen = self.seen_pages.get(key)
+            if seen is None and key in self.new_files:
+                continue  # unchanged file
+            for number, page in old_entry["pages"].items():
+                if seen is None or number not in seen:
+                    self.to_drop.extend(page["chunk_ids"])
+
+
+def ingest(data_path=DATA_PATH, db_path=DB_FAISS_PATH, full=False,
+           workers=None, batch_size=DEFAULT_BATCH_SIZE, index_spec=None, backend=None,
+           embedding_model=None):
+    index_spec = index_spec or make_index_spec()
+    if embedding_model is None:
+        backend = resolve_backend(backend)
+    else:
+        # A caller-supplied model (benchmarks, tests) is recorded by name.
+        backend = backend or type(embedding_model).__name__
+    config = ingest_config(index_spec, backend)
+    manifest = load_manifest(db_path)
+    index_exists = os.path.exists(os.path.join(db_path, "index.faiss"))
+    if full or manifest is None or not index_exists or manifest.get("config") != config:
+        manifest = {"config": config, "files": {}}
+        full = True
+
+    plan = IngestPlan(manifest["files"], data_path)
+    stats = {"unchanged": 0, "changed": 0, "new": 0, "deleted": 0}
+    changed_paths = []
+
+    for path in list_pdf_files(data_path):
+        key = plan.key(path)
+        file_hash = sha256_file(path)
+        old_entry = plan.old_files.get(key)
+
+        if old_entry is not None and old_entry["sha256"] == file_hash:
+            plan.new_files[key] = old_entry
+            stats["unchanged"] += 1
+            continue
+
+        stats["changed" if old_entry else "new"] += 1
+        plan.start_file(path, file_hash)
+        changed_paths.append(path)
+
+    stats["deleted"] = sum(1 for key in plan.old_files if key not in plan.new_files)
+    print(f"Files: {stats}")
+
+    if not full and not supports_removal(index_spec) and (stats["changed"] or stats["deleted"]):
+        print(f"A {index_spec['kind']} index cannot drop old chunks; rebuilding.")
+        return ingest(data_path, db_path, full=True, workers=workers,
+                      batch_size=batch_size, index_spec=index_spec, backend=backend,
+                      embedding_model=embedding_model)
+
+    if not changed_paths and not stats["deleted"] and not full:
+        old_meta = load_index_meta(db_path)
+        if old_meta is not None:
+            save_index_meta(db_path, _with_search_params(old_meta, index_spec),
+                            old_meta.get("ntotal"))
+        missing = [path for path in (lexical_path(db_path), chunk_store_path(db_path))
+                   if not os.path.exists(path)]
+        if missing:
+            db = load_faiss(db_path, embedding_model or get_embedding_model(backend=backend))
+            print(f"Built BM25 index: {build_from_vectorstore(db, db_path)} terms")
+            print(f"Built chunk store: {build_chunk_store(db, db_path)} chunks")
+        print("Vectorstore is up to date.")
+        return stats
+
+    # Step 6: Parse -> chunk -> embed -> write, streaming
+    tune_threads()
+    embedding_model = embedding_model or get_embedding_model(backend=backend)
+    db = None if full else load_faiss(db_path, embedding_model)
+    old_meta = None if full else load_index_meta(db_path)
+    writer = FaissWriter(embedding_model, db, None if index_spec["kind"] == "flat" else index_spec)
+    progress = IngestProgress()
+
+    pages = iter_pages(changed_paths, workers=workers)
+    chunks = plan.changed_chunks(pages, get_text_splitter(), progress)
+    added = set()
+    for batch in iter_batches(chunks, batch_size):
+        docs, ids = zip(*batch)
+        writer.write(list(docs), list(ids))
+        added.update(ids)
+        progress.add(chunks=len(batch))
+    writer.flush()
+    progress.report(final=True)
+
+    plan.finish()
+    to_drop = [i for i in plan.to_drop if i not in added]
+    print(f"Chunks added: {len(added)}  chunks removed: {len(to_drop)}")
+
+    if writer.db is None:
+        print("No PDF content found; nothing to index.")
+        return stats
+    if to_drop:
+        writer.db.delete(to_drop)
+
+    # Step 7: Store embeddings in FAISS
+    writer.db.save_local(db_path)
+    if writer.resolved_spec is not None:
+        meta = writer.resolved_spec
+    elif old_meta is not None:
+        meta = _with_search_params(old_meta, index_spec)
+    else:
+        meta = index_spec
+    save_index_meta(db_path, meta, writer.db.index.ntotal)
+    terms = build_from_vectorstore(writer.db, db_path)
+    build_chunk_store(writer.db, db_path)
+    manifest["files"] = plan.new_files
+    save_manifest(manifest, db_path)
+
+    print(f"Index now holds {writer.db.index.ntotal} chunks ({terms} BM25 terms)")
+    return stats
+
 
-text_chunks=create_chunks(extracted_data=documents)
-print("Length of Text Chunks: ", len(text_chunks))
+def _with_search_params(meta, index_spec):
+    params = dict(meta["params"])
+    params.update((k, index_spec["params"][k]) for k in SEARCH_PARAMS)
+    return {"kind": meta["kind"], "params": params}
 
-# Step 3: Create Vector Embeddings 
 
-def get_embedding_model():
-    embedding_model=HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    return embedding_model
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or update the Medibot vectorstore.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--db", default=DB_FAISS_PATH)
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parser processes")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Chunks per embedding batch")
+    parser.add_argument("--embeddings", choices=BACKENDS, default=None,
+                        help="Embedding backend (default: $MEDIBOT_EMBEDDINGS or torch)")
+    parser.add_argument("--index", choices=INDEX_KINDS, default="flat",
+                        help="FAISS index type")
+    for name in DEFAULT_PARAMS:
+        parser.add_argument("--" + name.replace("_", "-"), type=int, default=None,
+                            help=f"Index parameter (default {DEFAULT_PARAMS[name]})")
+    args = parser.parse_args(argv)
+    spec = make_index_spec(args.index, **{name: getattr(args, name) for name in DEFAULT_PARAMS})
+    ingest(args.data, args.db, full=args.full, workers=args.workers,
+           batch_size=args.batch_size, index_spec=spec, backend=args.embeddings)
 
-embedding_model=get_embedding_model()
 
-# Step 4: Store embeddings in FAISS
-DB_FAISS_PATH="vectorstore/db_faiss"
-db=FAISS.from_documents(text_chunks, embedding_model)
-db.save_local(DB_FAISS_PATH)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Embedding backends for Medibot.
+
+``torch`` (the default) is LangChain's ``HuggingFaceEmbeddings`` on
+sentence-transformers. ``onnx`` and ``onnx-int8`` run an exported copy of
+all-MiniLM-L6-v2 on onnxruntime from local files: no torch import at
+startup, a much smaller resident set and faster single-query embedding on
+CPU. Both ONNX variants reproduce the sentence-transformers pipeline
+(WordPiece tokenizer, mean pooling over the attention mask, L2
+normalisation) behind the same ``embed_query`` / ``embed_documents``
+interface, so FAISS, the answer cache and the chain do not change.
+
+Export once on a machine with torch installed, then check parity:
+
+    python -m medibot.embeddings export
+    python -m medibot.embeddings parity --backend onnx-int8
+
+The backend is picked with ``MEDIBOT_EMBEDDINGS`` (torch, onnx, onnx-int8).
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_MODEL_DIR = "models/onnx/all-MiniLM-L6-v2"
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "torch"
+MAX_SEQ_LENGTH = 256  # sentence-transformers' setting for this model
+# Lowest acceptable cosine with the torch embedding of the same text.
+MIN_COSINE = {"onnx": 0.9999, "onnx-int8": 0.99}
+
+PARITY_SENTENCES = [
+    "What are the symptoms of type 2 diabetes?",
+    "How is community-acquired pneumonia treated in adults?",
+    "Side effects of long-term corticosteroid therapy",
+    "Atrial fibrillation: rate control versus rhythm control",
+    "Guillain-Barré syndrome presents with ascending weakness.",
+    "Metformin is contraindicated in severe renal impairment.",
+    "fever headache stiff neck photophobia",
+    "Hypertension",
+]
+
+
+class OnnxEmbeddings(Embeddings):
+    """all-MiniLM-L6-v2 on onnxruntime, matching sentence-transformers' output."""
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=False, batch_size=64,
+                 max_length=MAX_SEQ_LENGTH, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        path = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+
+        hidden = self.session.run(None, feeds)[0]
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        # Batch texts of similar length together so little padding is computed.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[start:start + self.batch_size]
+                   for start in range(0, len(order), self.batch_size)]
+        encoded = [self._encode([texts[i] for i in batch]) for batch in batches]
+        out = np.empty((len(texts), encoded[0].shape[1]), dtype=np.float32)
+        for batch, vectors in zip(batches, encoded):
+            out[batch] = vectors
+        return out.tolist()
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
+
+
+def resolve_backend(backend=None):
+    backend = backend or os.environ.get("MEDIBOT_EMBEDDINGS", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    return backend
+
+
+def load_embedding_model(backend=None, batch_size=64, local_files_only=False,
+                         model_dir=ONNX_MODEL_DIR):
+    backend = resolve_backend(backend)
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        model_kwargs = {"local_files_only": True} if local_files_only else {}
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, model_kwargs=model_kwargs,
+                                     encode_kwargs={"batch_size": batch_size})
+    return OnnxEmbeddings(model_dir, quantized=backend == "onnx-int8", batch_size=batch_size)
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def export_onnx(model_dir=ONNX_MODEL_DIR, quantize=True, opset=17):
+    """Export the transformer to ONNX (pooling stays in NumPy) and int8-quantize it."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+    tokenizer.save_pretrained(model_dir)  # writes tokenizer.json
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL).eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            os.path.join(model_dir, ONNX_FILE),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=opset,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(os.path.join(model_dir, ONNX_FILE),
+                         os.path.join(model_dir, ONNX_INT8_FILE),
+                         weight_type=QuantType.QInt8)
+
+
+# -------------------------------------------------
+# Parity
+# -------------------------------------------------
+def parity(backend="onnx-int8", texts=None, model_dir=ONNX_MODEL_DIR):
+    """Cosine similarity between torch and ``backend`` embeddings of each text."""
+    texts = texts or PARITY_SENTENCES
+    reference = np.asarray(load_embedding_model("torch").embed_documents(texts))
+    candidate = np.asarray(load_embedding_model(backend, model_dir=model_dir).embed_documents(texts))
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate /= np.linalg.norm(candidate, axis=1, keepdims=True)
+    return (reference * candidate).sum(axis=1)
+
+
+def load_parity_texts(db_path, limit):
+    """Sample chunk texts from a built vectorstore for a corpus-shaped check."""
+    path = os.path.join(db_path, "index.pkl")
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        docstore, _ = pickle.load(f)
+    docs = list(docstore._dict.values())
+    step = max(1, len(docs) // limit)
+    return [doc.page_content for doc in docs[::step][:limit]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ONNX embedding backend tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export all-MiniLM-L6-v2 to ONNX")
+    export.add_argument("--dir", default=ONNX_MODEL_DIR)
+    export.add_argument("--no-quantize", action="store_true")
+
+    check = sub.add_parser("parity", help="Compare an ONNX backend with torch")
+    check.add_argument("--backend", choices=BACKENDS[1:], default="onnx-int8")
+    check.add_argument("--dir", default=ONNX_MODEL_DIR)
+    check.add_argument("--db", default=None, help="Also sample chunks from this vectorstore")
+    check.add_argument("--samples", type=int, default=200)
+    check.add_argument("--min-cosine", type=float, default=None,
+                       help="Fail below this (default 0.9999 for onnx, 0.99 for onnx-int8)")
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        export_onnx(args.dir, quantize=not args.no_quantize)
+        print(f"Exported to {args.dir}")
+        return
+
+    texts = list(PARITY_SENTENCES)
+    if args.db:
+        texts += load_parity_texts(args.db, args.samples)
+    cosines = parity(args.backend, texts, args.dir)
+    floor = args.min_cosine or MIN_COSINE[args.backend]
+    print(f"{args.backend} vs torch over {len(texts)} texts: "
+          f"min cosine {cosines.min():.5f}, mean {cosines.mean():.5f}")
+    if cosines.min() < floor:
+        print(f"FAIL: below {floor}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
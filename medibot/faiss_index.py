@@ -0,0 +1,191 @@
+"""
+Configurable FAISS index types for the Medibot vectorstore.
+
+The index type is chosen at build time and recorded, with its tuning
+parameters, in ``index_meta.json`` next to the index so the app can apply
+the matching search-time settings after loading.
+
+    kind       factory string       notes
+    flat       Flat                 exact brute force (baseline)
+    hnsw       HNSW{hnsw_m}         graph search; no deletions
+    ivf-flat   IVF{nlist},Flat      inverted lists, full vectors; no deletions
+    ivf-pq     IVF{nlist},PQ{pq_m}  inverted lists, product-quantised codes; no deletions
+    sq8        SQ8                  8-bit scalar quantisation, brute force
+"""
+import json
+import math
+import os
+
+import numpy as np
+
+INDEX_META_NAME = "index_meta.json"
+INDEX_KINDS = ("flat", "hnsw", "ivf-flat", "ivf-pq", "sq8")
+
+DEFAULT_PARAMS = {
+    "nlist": 1024,
+    "nprobe": 16,
+    "pq_m": 48,
+    "pq_nbits": 8,
+    "hnsw_m": 32,
+    "ef_construction": 200,
+    "ef_search": 64,
+}
+
+SEARCH_PARAMS = ("nprobe", "ef_search")
+
+# IVF training wants ~39 points per list; PQ wants 2**nbits per codebook.
+MIN_POINTS_PER_LIST = 39
+
+
+def make_index_spec(kind="flat", **params):
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown index kind {kind!r}; choose from {', '.join(INDEX_KINDS)}")
+    merged = dict(DEFAULT_PARAMS)
+    merged.update({k: v for k, v in params.items() if v is not None})
+    return {"kind": kind, "params": merged}
+
+
+def needs_training(spec):
+    return spec["kind"] in ("ivf-flat", "ivf-pq", "sq8")
+
+
+def supports_removal(spec):
+    # Flat-code indexes compact on remove_ids, matching LangChain's
+    # renumbering of index_to_docstore_id. IVF keeps the old ids and HNSW
+    # cannot remove at all, so both are rebuilt instead.
+    return spec["kind"] in ("flat", "sq8")
+
+
+def training_size(spec):
+    """How many vectors to buffer before training the index."""
+    p = spec["params"]
+    if spec["kind"] == "ivf-pq":
+        return max(p["nlist"] * MIN_POINTS_PER_LIST, 2 ** p["pq_nbits"] * 39)
+    if spec["kind"] == "ivf-flat":
+        return p["nlist"] * MIN_POINTS_PER_LIST
+    if spec["kind"] == "sq8":
+        return 10000
+    return 0
+
+
+def build_config(spec):
+    """The part of ``spec`` that shapes the stored index (search knobs excluded)."""
+    params = {k: v for k, v in spec["params"].items() if k not in SEARCH_PARAMS}
+    return {"kind": spec["kind"], "params": params}
+
+
+def resolve_spec(spec, n_train):
+    """Shrink ``nlist`` so a small training set can still fill every list."""
+    params = dict(spec["params"])
+    if spec["kind"] in ("ivf-flat", "ivf-pq") and n_train:
+        params["nlist"] = max(1, min(params["nlist"],
+                                     n_train // MIN_POINTS_PER_LIST,
+                                     int(4 * math.sqrt(n_train))))
+    return {"kind": spec["kind"], "params": params}
+
+
+def factory_string(spec):
+    p = spec["params"]
+    kind = spec["kind"]
+    if kind == "flat":
+        return "Flat"
+    if kind == "sq8":
+        return "SQ8"
+    if kind == "hnsw":
+        return f"HNSW{p['hnsw_m']}"
+    if kind == "ivf-flat":
+        return f"IVF{p['nlist']},Flat"
+    return f"IVF{p['nlist']},PQ{p['pq_m']}x{p['pq_nbits']}"
+
+
+def build_index(spec, dim, training_vectors=None):
+    """Create (and train, if needed) an empty index for an already resolved ``spec``."""
+    import faiss
+
+    index = faiss.index_factory(dim, factory_string(spec), faiss.METRIC_L2)
+
+    if spec["kind"] == "hnsw":
+        index.hnsw.efConstruction = spec["params"]["ef_construction"]
+    if not index.is_trained:
+        if training_vectors is None or not len(training_vectors):
+            raise ValueError(f"A {spec['kind']} index needs training vectors")
+        index.train(np.ascontiguousarray(training_vectors, dtype=np.float32))
+
+    apply_search_params(index, spec)
+    return index
+
+
+def apply_search_params(index, spec):
+    """Set query-time knobs (nprobe / efSearch) recorded in ``spec``."""
+    if spec is None:
+        return
+    import faiss
+
+    p = spec["params"]
+    if spec["kind"] in ("ivf-flat", "ivf-pq"):
+        faiss.extract_index_ivf(index).nprobe = p["nprobe"]
+    elif spec["kind"] == "hnsw":
+        faiss.downcast_index(index).hnsw.efSearch = p["ef_search"]
+
+
+def save_index_meta(db_path, spec, ntotal=None):
+    meta = dict(spec, factory=factory_string(spec))
+    if ntotal is not None:
+        meta["ntotal"] = int(ntotal)
+    with open(os.path.join(db_path, INDEX_META_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_index_meta(db_path):
+    path = os.path.join(db_path, INDEX_META_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_faiss(db_path, embedding_model, read_only=False):
+    """``FAISS.load_local`` plus the search-time settings from ``index_meta.json``.
+
+    With ``read_only`` the index's vectors are memory-mapped where the index
+    type allows it (read normally otherwise) and chunks are served from the
+    pickle-free ``medibot.chunk_store`` when one matching the index exists.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    db = _load_read_only(db_path, embedding_model) if read_only else None
+    if db is None:
+        db = FAISS.load_local(db_path, embedding_model, allow_dangerous_deserialization=True)
+    apply_search_params(db.index, load_index_meta(db_path))
+    return db
+
+
+def _load_read_only(db_path, embedding_model):
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    from medibot.chunk_store import RowIds, load_chunk_store
+
+    path = os.path.join(db_path, "index.faiss")
+    try:
+        # MMAP_IFC maps the stored codes of flat-code indexes (and their
+        # HNSW / IVF storage) straight from the file, so workers share one
+        # copy through the page cache. IO_FLAG_MMAP alone leaves IndexFlat
+        # fully resident.
+        index = faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC)
+    except RuntimeError:
+        index = faiss.read_index(path)  # index type without mmap support
+    store = load_chunk_store(db_path, index.ntotal)
+    if store is None:
+        return None
+    return FAISS(embedding_model, index, store, RowIds(store.doc_ids))
+
+
+def enable_reconstruct(index):
+    """IVF indexes need a direct map before stored vectors can be read back."""
+    import faiss
+
+    try:
+        faiss.extract_index_ivf(index).make_direct_map()
+    except RuntimeError:
+        pass  # not an IVF index
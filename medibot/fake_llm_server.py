@@ -0,0 +1,158 @@
+"""
+Local stand-in for the Groq chat completions API, for offline benchmarks.
+
+Speaks just enough of the OpenAI-compatible protocol that ``ChatGroq`` uses
+(``POST /openai/v1/chat/completions``, plain JSON or server-sent-event
+streaming) and answers with canned tokens after a configurable time to
+first token and per-token delay. Point the app at it with
+``GROQ_API_BASE=http://127.0.0.1:<port>``.
+
+    python -m medibot.fake_llm_server --port 8765 --token-delay-ms 20
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TOKENS = 64
+DEFAULT_TOKEN_DELAY_MS = 20.0
+DEFAULT_FIRST_TOKEN_MS = 150.0
+
+ANSWER_WORDS = (
+    "Based on the provided context, the condition is usually managed with "
+    "supportive care, targeted drug therapy and regular follow-up; "
+    "consult a clinician for diagnosis and dosing."
+).split()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, tokens=DEFAULT_TOKENS, token_delay_ms=DEFAULT_TOKEN_DELAY_MS,
+                 first_token_ms=DEFAULT_FIRST_TOKEN_MS, host="127.0.0.1"):
+        super().__init__((host, port), _Handler)
+        self.tokens = tokens
+        self.token_delay = token_delay_ms / 1000
+        self.first_token = first_token_ms / 1000
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def answer_tokens(self):
+        words = itertools.islice(itertools.cycle(ANSWER_WORDS), self.tokens)
+        return [word + " " for word in words]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+    # TCP_NODELAY: otherwise Nagle plus delayed ACK holds each small SSE
+    # frame back ~40 ms and skews the first-token numbers being measured.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server._lock:
+            server.requests += 1
+
+        model = body.get("model", "fake")
+        created = int(time.time())
+        tokens = server.answer_tokens()
+        time.sleep(server.first_token)
+
+        if not body.get("stream"):
+            time.sleep(server.token_delay * max(len(tokens) - 1, 0))
+            self._send_json({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens),
+                          "total_tokens": len(tokens)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(server.token_delay)
+            self._send_event({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": token},
+                             "finish_reason": None}],
+            })
+        self._send_event({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        })
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+    def _send_json(self, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, payload):
+        self._send_chunk(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+
+    def _send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake Groq chat completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS)
+    parser.add_argument("--token-delay-ms", type=float, default=DEFAULT_TOKEN_DELAY_MS)
+    parser.add_argument("--first-token-ms", type=float, default=DEFAULT_FIRST_TOKEN_MS)
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(args.port, args.tokens, args.token_delay_ms, args.first_token_ms)
+    print(f"Fake LLM listening on {server.base_url} (GROQ_API_BASE={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
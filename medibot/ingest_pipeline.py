@@ -0,0 +1,204 @@
+"""
+Streaming stages for building the Medibot vectorstore.
+
+    PDF page ranges --(process pool)--> pages --> chunks --> fixed-size
+    batches --(embedder)--> vectors --(writer)--> FAISS index
+
+Each stage is a generator, so at most ``max_pending`` parsed page ranges
+and one embedding batch are held in memory at a time, however large the
+corpus grows (plus the training sample for IVF/PQ/SQ indexes, see
+``medibot.faiss_index``). ``IngestProgress`` reports pages/s and chunks/s as it goes.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+from langchain_core.documents import Document
+
+from medibot.faiss_index import build_index, needs_training, resolve_spec, training_size
+
+DEFAULT_PAGES_PER_TASK = 32
+DEFAULT_BATCH_SIZE = 256
+
+
+# -------------------------------------------------
+# Stage 1: parallel PDF parsing
+# -------------------------------------------------
+def count_pages(path):
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def _parse_range(path, start, stop):
+    """Worker: extract pages ``[start, stop)`` the way PyPDFLoader does."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    labels = reader.page_labels
+    total = len(reader.pages)
+    pages = []
+    for number in range(start, min(stop, total)):
+        text = reader.pages[number].extract_text(extraction_mode="plain").strip()
+        pages.append((number, labels[number], total, text))
+    return path, pages
+
+
+def iter_pages(paths, workers=None, pages_per_task=DEFAULT_PAGES_PER_TASK, max_pending=None):
+    """
+    Yield page ``Document``s of ``paths`` in file/page order.
+
+    Page ranges are parsed in a process pool; at most ``max_pending``
+    ranges are in flight or waiting to be consumed.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+
+    tasks = (
+        (path, start, start + pages_per_task)
+        for path in paths
+        for start in range(0, count_pages(path), pages_per_task)
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(_parse_range, *task) for task in islice(tasks, max_pending)]
+        while pending:
+            path, pages = pending.pop(0).result()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.submit(_parse_range, *task))
+            for number, label, total, text in pages:
+                yield Document(
+                    page_content=text,
+                    metadata={"source": path, "page": number,
+                              "page_label": label, "total_pages": total},
+                )
+
+
+# -------------------------------------------------
+# Stage 2/3: chunking and batching
+# -------------------------------------------------
+def iter_chunks(pages, splitter):
+    for page in pages:
+        yield from splitter.split_documents([page])
+
+
+def iter_batches(items, size=DEFAULT_BATCH_SIZE):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def tune_threads(threads=None):
+    """Give the embedder every core (or ``threads``) for its forward passes."""
+    threads = threads or os.cpu_count() or 1
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+    try:
+        import torch
+    except ImportError:
+        return threads
+    torch.set_num_threads(threads)
+    return threads
+
+
+# -------------------------------------------------
+# Stage 4: embedding + FAISS writer
+# -------------------------------------------------
+class FaissWriter:
+    """Embed batches of chunks and append them to a (possibly new) FAISS index.
+
+    With no ``index_spec`` a new index is the flat one LangChain builds by
+    default. Trainable types (IVF, PQ, SQ) buffer the first batches until
+    there are enough vectors to train on; ``flush`` trains on whatever was
+    buffered when the stream is shorter than that.
+    """
+
+    def __init__(self, embedding_model, db=None, index_spec=None):
+        self.embedding_model = embedding_model
+        self.db = db
+        self.index_spec = index_spec
+        self.resolved_spec = None
+        self._pending = []
+        self._pending_count = 0
+
+    def write(self, chunks, ids):
+        texts = [c.page_content for c in chunks]
+        metadatas = [c.metadata for c in chunks]
+        vectors = self.embedding_model.embed_documents(texts)
+
+        if self.db is None and self.index_spec is not None:
+            self._pending.append((texts, vectors, metadatas, list(ids)))
+            self._pending_count += len(texts)
+            if self._pending_count >= training_size(self.index_spec):
+                self.flush()
+            return
+        self._add(texts, vectors, metadatas, ids)
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        if self.db is None:
+            self._create(np.asarray([v for batch in pending for v in batch[1]],
+                                    dtype=np.float32))
+        for texts, vectors, metadatas, ids in pending:
+            self._add(texts, vectors, metadatas, ids)
+
+    def _create(self, sample):
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+
+        n_train = len(sample) if needs_training(self.index_spec) else None
+        self.resolved_spec = resolve_spec(self.index_spec, n_train)
+        index = build_index(self.resolved_spec, sample.shape[1],
+                            sample if n_train else None)
+        self.db = FAISS(self.embedding_model, index, InMemoryDocstore(), {})
+
+    def _add(self, texts, vectors, metadatas, ids):
+        from langchain_community.vectorstores import FAISS
+
+        pairs = list(zip(texts, vectors))
+        if self.db is None:
+            self.db = FAISS.from_embeddings(pairs, self.embedding_model,
+                                            metadatas=metadatas, ids=ids)
+        else:
+            self.db.add_embeddings(pairs, metadatas=metadatas, ids=ids)
+
+
+# -------------------------------------------------
+# Progress
+# -------------------------------------------------
+class IngestProgress:
+    def __init__(self, every=5.0, stream=sys.stdout):
+        self.pages = 0
+        self.chunks = 0
+        self.every = every
+        self.stream = stream
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def add(self, pages=0, chunks=0):
+        self.pages += pages
+        self.chunks += chunks
+        now = time.perf_counter()
+        if now - self._last >= self.every:
+            self._last = now
+            self.report()
+
+    def rates(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return elapsed, self.pages / elapsed, self.chunks / elapsed
+
+    def report(self, final=False):
+        elapsed, pages_s, chunks_s = self.rates()
+        label = "Done" if final else "Progress"
+        print(f"{label}: {self.pages} pages ({pages_s:.1f}/s), "
+              f"{self.chunks} chunks ({chunks_s:.1f}/s) in {elapsed:.1f}s",
+              file=self.stream, flush=True)
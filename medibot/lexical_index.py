@@ -0,0 +1,157 @@
+"""
+BM25 inverted index over the chunks in the Medibot vectorstore.
+
+MiniLM embeddings blur exact terms (drug names, eponyms, lab values), so
+retrieval also runs a lexical search and fuses the two rankings. The index
+is rebuilt from the FAISS docstore at the end of every ingestion run and
+stored next to it as a ``mediguide.bundle``:
+
+    weights   csr  float32  terms x chunks, BM25 weight of each posting
+    vocab     strings       term of each row
+    doc_ids   strings       FAISS docstore id of each column
+
+Weights already fold in idf and length normalisation, so scoring a query
+is a sum of a few sparse rows.
+"""
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from mediguide.bundle import BundleWriter, load_bundle
+
+LEXICAL_DIR_NAME = "lexical"
+BUNDLE_KIND = "bm25"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r"[^\W_]+(?:['-][^\W_]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers him his how i if
+in into is it its itself just me more most my no nor not now of off on once only
+or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your
+""".split())
+
+
+def tokenize(text):
+    # NFKC folds the PDF ligatures ("ﬂ" -> "fl") that would split drug names.
+    text = unicodedata.normalize("NFKC", text).lower()
+    return [t for t in TOKEN_RE.findall(text) if t not in STOPWORDS and len(t) > 1]
+
+
+def lexical_path(db_path):
+    return os.path.join(db_path, LEXICAL_DIR_NAME)
+
+
+# -------------------------------------------------
+# Building
+# -------------------------------------------------
+def build_weights(token_lists, k1=BM25_K1, b=BM25_B):
+    """``(vocab, csr terms x docs)`` of BM25 posting weights."""
+    from scipy import sparse
+
+    vocab = {}
+    rows, cols, tfs = [], [], []
+    doc_len = np.zeros(len(token_lists), dtype=np.float32)
+    for doc, tokens in enumerate(token_lists):
+        doc_len[doc] = len(tokens)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            rows.append(vocab.setdefault(token, len(vocab)))
+            cols.append(doc)
+            tfs.append(tf)
+
+    n_docs = len(token_lists)
+    tf = np.asarray(tfs, dtype=np.float32)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+
+    df = np.bincount(rows, minlength=len(vocab)).astype(np.float32)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    avgdl = doc_len.mean() if n_docs else 1.0
+    norm = k1 * (1 - b + b * doc_len[cols] / avgdl)
+    weights = idf[rows] * tf * (k1 + 1) / (tf + norm)
+
+    matrix = sparse.csr_matrix((weights.astype(np.float32), (rows, cols)),
+                               shape=(len(vocab), n_docs))
+    terms = sorted(vocab, key=vocab.get)
+    return terms, matrix
+
+
+def build_lexical_index(db_path, doc_ids, texts, version="1"):
+    terms, weights = build_weights([tokenize(t) for t in texts])
+    with BundleWriter(lexical_path(db_path), kind=BUNDLE_KIND, version=version,
+                      meta={"k1": BM25_K1, "b": BM25_B}) as writer:
+        writer.add_sparse("weights", weights)
+        writer.add_strings("vocab", terms)
+        writer.add_strings("doc_ids", doc_ids)
+    return len(terms)
+
+
+def build_from_vectorstore(db, db_path):
+    """Index every chunk in a LangChain FAISS store, in FAISS row order."""
+    doc_ids = [db.index_to_docstore_id[i] for i in range(len(db.index_to_docstore_id))]
+    texts = [db.docstore.search(doc_id).page_content for doc_id in doc_ids]
+    return build_lexical_index(db_path, doc_ids, texts)
+
+
+# -------------------------------------------------
+# Querying
+# -------------------------------------------------
+class LexicalIndex:
+    def __init__(self, weights, vocab, doc_ids):
+        self.weights = weights
+        self.term_of = {term: i for i, term in enumerate(vocab)}
+        self.doc_ids = list(doc_ids)
+
+    @classmethod
+    def load(cls, db_path):
+        bundle = load_bundle(lexical_path(db_path), kind=BUNDLE_KIND)
+        return cls(bundle["weights"], bundle["vocab"], bundle["doc_ids"])
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def search(self, query, k):
+        """``[(docstore id, score)]`` of the ``k`` best BM25 matches."""
+        rows = {self.term_of[t] for t in tokenize(query) if t in self.term_of}
+        if not rows:
+            return []
+
+        indptr, indices, data = self.weights.indptr, self.weights.indices, self.weights.data
+        docs = np.concatenate([indices[indptr[r]:indptr[r + 1]] for r in rows])
+        weights = np.concatenate([data[indptr[r]:indptr[r + 1]] for r in rows])
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in top]
+
+
+def load_lexical_index(db_path):
+    """The stored index, or None when the vectorstore predates it."""
+    if not os.path.exists(lexical_path(db_path)):
+        return None
+    return LexicalIndex.load(db_path)
+
+
+def reciprocal_rank_fusion(rankings, k, rrf_k=60):
+    """Fuse ranked id lists: score(d) = sum of 1 / (rrf_k + rank)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:k]
@@ -0,0 +1,102 @@
+"""
+Cached artifact loaders for the Medibot page.
+
+Like ``mediguide.loaders``: the page and ``mediguide.warmup`` call these
+same ``st.cache_resource`` functions, so a server that warmed up in the
+background hands the first visitor a loaded vectorstore and chain. The
+heavy modules (FAISS, langchain, the embedding backend and, with the torch
+backend, torch itself) are only imported inside the loaders.
+"""
+import asyncio
+import os
+
+import streamlit as st
+
+from mediguide import metrics
+
+
+def use_offline_models():
+    # Never reach the Hugging Face Hub from a serving process.
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+
+def ensure_event_loop():
+    # Script threads (and the warm-up thread) have no event loop by default.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+def groq_api_key():
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv())
+    return os.environ.get("GROQ_API_KEY")
+
+
+@st.cache_resource
+@metrics.timed("artifact_load_ms", page="medibot", artifact="vectorstore")
+def load_vectorstore():
+    from medibot.batch_embedder import BatchingEmbedder
+    from medibot.chain import DB_FAISS_PATH
+    from medibot.embeddings import load_embedding_model
+    from medibot.faiss_index import load_faiss
+
+    use_offline_models()
+    # MEDIBOT_EMBEDDINGS=onnx-int8 serves queries without importing torch.
+    embedding_model = load_embedding_model(local_files_only=True)
+    # Queries from all sessions share batched forward passes.
+    window_ms = float(os.environ.get("MEDIBOT_BATCH_WINDOW_MS", 3))
+    if window_ms > 0:
+        embedding_model = BatchingEmbedder(embedding_model, window_ms=window_ms)
+
+    # Read-only: index vectors mapped from disk where the index type allows
+    # it, chunks from the bundle chunk store, no unpickling.
+    return load_faiss(DB_FAISS_PATH, embedding_model, read_only=True)
+
+
+@st.cache_resource
+def load_answer_cache():
+    from medibot.answer_cache import AnswerCache
+
+    return AnswerCache(
+        path=os.environ.get("MEDIBOT_CACHE_DIR", "vectorstore/answer_cache"),
+        maxsize=int(os.environ.get("MEDIBOT_CACHE_SIZE", 1000)),
+        ttl=float(os.environ.get("MEDIBOT_CACHE_TTL", 7 * 24 * 3600)),
+        threshold=float(os.environ.get("MEDIBOT_CACHE_THRESHOLD", 0.95)),
+        save_delay=float(os.environ.get("MEDIBOT_CACHE_SAVE_DELAY", 5)),
+    )
+
+
+def load_compressor():
+    from medibot.context import ContextCompressor
+
+    return ContextCompressor(
+        token_budget=int(os.environ.get("MEDIBOT_TOKEN_BUDGET", 1000)),
+        duplicate_threshold=float(os.environ.get("MEDIBOT_DEDUPE_THRESHOLD", 0.9)),
+    )
+
+
+@st.cache_resource
+@metrics.timed("artifact_load_ms", page="medibot", artifact="chain")
+def load_chain(api_key):
+    from medibot.chain import DB_FAISS_PATH, MedibotChain
+    from medibot.lexical_index import load_lexical_index
+
+    ensure_event_loop()
+    # Shared by every session: one Groq client with a pooled keep-alive
+    # HTTP connection, one retriever, one prompt, one answer cache. The BM25
+    # index is optional: vectorstores built before it fall back to FAISS only.
+    return MedibotChain(load_vectorstore(), api_key=api_key, cache=load_answer_cache(),
+                        lexical=load_lexical_index(DB_FAISS_PATH),
+                        compressor=load_compressor())
+
+
+def warm_medibot():
+    """Load the vectorstore and, when a Groq key is configured, the chain."""
+    load_vectorstore()
+    api_key = groq_api_key()
+    if api_key:
+        load_chain(api_key)
@@ -0,0 +1,253 @@
+"""
+Versioned, memory-mappable artifact bundles.
+
+A bundle is a directory holding raw ``.npy`` files plus a ``manifest.json``
+describing them (format version, artifact version, shapes, dtypes, and a
+SHA-256 checksum, size and mtime per file). Dense arrays, CSR/CSC matrices and string
+columns are all stored as plain numeric arrays, so loading is an
+``np.load(..., mmap_mode="r")`` per file: nothing is unpickled, several
+server processes share the same pages through the OS cache, and the files
+do not depend on the pandas or scikit-learn version that wrote them.
+
+Checksums are checked when a file is first loaded if its size or mtime no
+longer matches the manifest (the file was copied, rewritten or tampered
+with since the bundle was written); ``load_bundle(..., verify=True)``
+checks every file up front regardless.
+
+Layout of a string column ``names``::
+
+    names.bytes.npy    uint8   UTF-8 payload of every value, concatenated
+    names.offsets.npy  int64   n + 1 offsets into the payload
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+class BundleError(Exception):
+    pass
+
+
+# -------------------------------------------------
+# String columns
+# -------------------------------------------------
+class StringColumn:
+    """Read-only sequence of strings backed by two (memory-mapped) arrays."""
+
+    def __init__(self, payload, offsets):
+        self.payload = payload
+        self.offsets = offsets
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [("" if v is None else str(v)).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(
+            np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        )
+        payload = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(payload, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return bytes(self.payload[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_numpy(self):
+        return np.array(list(self), dtype=object)
+
+
+# -------------------------------------------------
+# Writing
+# -------------------------------------------------
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class BundleWriter:
+    def __init__(self, path, kind, version, meta=None):
+        self.path = path
+        self.manifest = {
+            "format_version": FORMAT_VERSION,
+            "kind": kind,
+            "version": version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "meta": meta or {},
+            "entries": {},
+            "files": {},
+        }
+        os.makedirs(path, exist_ok=True)
+
+    def _save(self, filename, array):
+        array = np.ascontiguousarray(array)
+        full = os.path.join(self.path, filename)
+        np.save(full, array, allow_pickle=False)
+        self.manifest["files"][filename] = {
+            "shape": list(array.shape),
+            "dtype": array.dtype.str,
+            "sha256": _sha256(full),
+            **_stat(full),
+        }
+
+    def add_array(self, name, array):
+        self._save(f"{name}.npy", np.asarray(array))
+        self.manifest["entries"][name] = {"type": "array"}
+
+    def add_sparse(self, name, matrix, layout="csr"):
+        matrix = matrix.asformat(layout)
+        matrix.sort_indices()
+        self._save(f"{name}.data.npy", matrix.data)
+        self._save(f"{name}.indices.npy", matrix.indices)
+        self._save(f"{name}.indptr.npy", matrix.indptr)
+        self.manifest["entries"][name] = {
+            "type": layout,
+            "shape": list(matrix.shape),
+        }
+
+    def add_strings(self, name, values):
+        column = values if isinstance(values, StringColumn) else StringColumn.from_values(values)
+        self._save(f"{name}.bytes.npy", column.payload)
+        self._save(f"{name}.offsets.npy", column.offsets)
+        self.manifest["entries"][name] = {"type": "strings", "length": len(column)}
+
+    def close(self):
+        # The manifest is written last so a half-written bundle never loads.
+        tmp = os.path.join(self.path, MANIFEST_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, MANIFEST_NAME))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+# -------------------------------------------------
+# Reading
+# -------------------------------------------------
+class Bundle:
+    def __init__(self, path, manifest, mmap_mode="r"):
+        self.path = path
+        self.manifest = manifest
+        self.mmap_mode = mmap_mode
+        self._cache = {}
+        self._checked = set()
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def meta(self):
+        return self.manifest["meta"]
+
+    def __contains__(self, name):
+        return name in self.manifest["entries"]
+
+    def _load(self, filename):
+        info = self.manifest["files"].get(filename)
+        if info is None:
+            raise BundleError(f"{filename} is not listed in {self.path}/{MANIFEST_NAME}")
+        full = os.path.join(self.path, filename)
+        if filename not in self._checked:
+            # Hashing is skipped only when the file is provably the one the
+            # writer hashed; manifests without size/mtime are always checked.
+            stat = _stat(full)
+            if any(info.get(key) != stat[key] for key in stat):
+                self._verify_file(filename, info)
+            self._checked.add(filename)
+        array = np.load(full, mmap_mode=self.mmap_mode, allow_pickle=False)
+        if list(array.shape) != info["shape"] or array.dtype.str != info["dtype"]:
+            raise BundleError(f"{filename} does not match its manifest entry")
+        return array
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            return self._cache[name]
+
+        entry = self.manifest["entries"].get(name)
+        if entry is None:
+            raise KeyError(name)
+
+        kind = entry["type"]
+        if kind == "array":
+            value = self._load(f"{name}.npy")
+        elif kind in ("csr", "csc"):
+            from scipy import sparse
+
+            cls = sparse.csr_matrix if kind == "csr" else sparse.csc_matrix
+            value = cls(
+                (self._load(f"{name}.data.npy"),
+                 self._load(f"{name}.indices.npy"),
+                 self._load(f"{name}.indptr.npy")),
+                shape=tuple(entry["shape"]),
+                copy=False,
+            )
+        elif kind == "strings":
+            value = StringColumn(self._load(f"{name}.bytes.npy"),
+                                 self._load(f"{name}.offsets.npy"))
+        else:
+            raise BundleError(f"Unknown entry type {kind!r} for {name}")
+
+        self._cache[name] = value
+        return value
+
+    def _verify_file(self, filename, info):
+        if _sha256(os.path.join(self.path, filename)) != info["sha256"]:
+            raise BundleError(f"Checksum mismatch for {filename}")
+
+    def verify(self):
+        """Recompute every checksum; raise BundleError on the first mismatch."""
+        for filename, info in self.manifest["files"].items():
+            self._verify_file(filename, info)
+            self._checked.add(filename)
+
+
+def load_bundle(path, kind=None, mmap_mode="r", verify=False):
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        raise BundleError(f"No bundle at {path}")
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise BundleError(
+            f"Bundle format {manifest.get('format_version')} is not supported "
+            f"(expected {FORMAT_VERSION})"
+        )
+    if kind is not None and manifest.get("kind") != kind:
+        raise BundleError(f"Expected a {kind!r} bundle, found {manifest.get('kind')!r}")
+
+    bundle = Bundle(path, manifest, mmap_mode=mmap_mode)
+    if verify:
+        bundle.verify()
+    return bundle
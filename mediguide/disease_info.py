@@ -0,0 +1,113 @@
+"""
+Precomputed per-disease information for the disease prediction page.
+
+The five reference CSVs (description, precautions, medications, diets,
+workout) hold one or a few rows for each of the 41 diseases. They are read
+and parsed once into a dict of ``DiseaseInfo`` records, so a lookup on the
+request path is a single dict access with no pandas filtering and no
+``ast.literal_eval``.
+
+Disease names are not spelled consistently across the CSVs and the model's
+labels (``"Diabetes "`` vs ``"Diabetes"``, doubled spaces, ``"diseae"``),
+so records are keyed by a normalised name.
+"""
+import ast
+import math
+import os
+import re
+from collections import namedtuple
+
+DATA_DIR = "data/Disease-Prediction-and-Medical dataset"
+
+DiseaseInfo = namedtuple(
+    "DiseaseInfo", "name description precautions medications diet workout"
+)
+
+# Typos in the training labels that whitespace/case folding can't fix.
+ALIASES = {
+    "peptic ulcer diseae": "peptic ulcer disease",
+}
+
+_SPACES = re.compile(r"\s+")
+
+
+def disease_key(name):
+    key = _SPACES.sub(" ", str(name)).strip().casefold()
+    return ALIASES.get(key, key)
+
+
+def _missing(value):
+    # pd.isna for a single CSV cell, so the page can import this module
+    # (and look records up) without importing pandas.
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _parse_list(value):
+    if _missing(value):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        parsed = value
+    items = parsed if isinstance(parsed, (list, tuple)) else [parsed]
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def _grouped(frame, name_column, value_column, parse=False):
+    grouped = {}
+    for name, value in zip(frame[name_column], frame[value_column]):
+        values = grouped.setdefault(disease_key(name), [])
+        if parse:
+            values.extend(_parse_list(value))
+        elif not _missing(value) and str(value).strip():
+            values.append(str(value).strip())
+    return grouped
+
+
+def build_disease_table(description, precautions, medications, diets, workout):
+    descriptions = _grouped(description, "Disease", "Description")
+    medication_lists = _grouped(medications, "Disease", "Medication", parse=True)
+    diet_lists = _grouped(diets, "Disease", "Diet", parse=True)
+    workout_lists = _grouped(workout, "disease", "workout")
+
+    precaution_columns = [c for c in precautions.columns if c.startswith("Precaution")]
+    precaution_lists = {}
+    for _, row in precautions.iterrows():
+        precaution_lists.setdefault(disease_key(row["Disease"]), []).extend(
+            str(row[c]).strip() for c in precaution_columns
+            if not _missing(row[c]) and str(row[c]).strip()
+        )
+
+    table = {}
+    for name in description["Disease"]:
+        key = disease_key(name)
+        if key in table:
+            continue
+        table[key] = DiseaseInfo(
+            name=_SPACES.sub(" ", name).strip(),
+            description=" ".join(descriptions.get(key, [])),
+            precautions=tuple(precaution_lists.get(key, [])),
+            medications=tuple(medication_lists.get(key, [])),
+            diet=tuple(diet_lists.get(key, [])),
+            workout=tuple(workout_lists.get(key, [])),
+        )
+    return table
+
+
+def load_disease_table(data_dir=DATA_DIR):
+    import pandas as pd
+
+    def read(filename):
+        return pd.read_csv(os.path.join(data_dir, filename))
+
+    return build_disease_table(
+        read("description.csv"),
+        read("precautions_df.csv"),
+        read("medications.csv"),
+        read("diets.csv"),
+        read("workout_df.csv"),
+    )
+
+
+def get_disease_info(table, disease):
+    return table.get(disease_key(disease))
@@ -0,0 +1,166 @@
+"""
+Batch disease prediction with top-k probabilities.
+
+Symptom lists are corrected in one pass (one fuzzy lookup per distinct
+unknown token across the whole batch), encoded into a single one-hot
+matrix and scored with one ``predict_proba`` call.
+
+    python -m mediguide.disease_predictor patients.csv --top-k 3 -o triage.csv
+
+The input CSV is shaped like ``symptoms_df.csv`` (``Symptom_1`` ...
+``Symptom_N`` columns) or has a single comma-separated ``symptoms`` column.
+"""
+import argparse
+import csv
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+from mediguide.forest import FOREST_BUNDLE_PATH, CompiledForest
+from mediguide.symptoms import TARGET_COLUMN, TRAINING_PATH, SymptomEncoder
+
+MODEL_PATH = "models/first_feature_models/RandomForest.pkl"
+DEFAULT_TOP_K = 3
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def load_class_names(path=TRAINING_PATH):
+    """Disease name per encoded label, i.e. the notebook's ``diseases_list``."""
+    prognosis = pd.read_csv(path, usecols=[TARGET_COLUMN])[TARGET_COLUMN]
+    return np.unique(prognosis).tolist()
+
+
+class DiseasePredictor:
+    def __init__(self, model, encoder, class_names):
+        self.model = model
+        self.encoder = encoder
+
+        trained_on = getattr(model, "feature_names_in_", None)
+        if trained_on is None:
+            trained_on = getattr(model, "feature_names", None)
+        if trained_on is not None and list(trained_on) != encoder.feature_columns:
+            raise ValueError("Model features do not match Training.csv columns.")
+        # Only a scikit-learn estimator needs a DataFrame to avoid its
+        # feature-name warning; the compiled forest takes the raw matrix.
+        self._wrap_frame = getattr(model, "feature_names_in_", None) is not None
+
+        # model.classes_ holds encoded labels; map probability columns to names.
+        self.labels = [class_names[int(c)] for c in model.classes_]
+
+    @classmethod
+    def from_artifacts(cls, model_path=MODEL_PATH, forest_path=FOREST_BUNDLE_PATH):
+        """Prefer the compiled forest bundle; fall back to the pickled model."""
+        if os.path.exists(forest_path):
+            model = CompiledForest.from_bundle(forest_path)
+        else:
+            with open(model_path, "rb") as f:
+                model = pickle.load(f)
+        return cls(model, SymptomEncoder.from_training_csv(), load_class_names())
+
+    def correct(self, symptom_lists):
+        """Canonical symptom names per row; unrecognised tokens are dropped."""
+        flat = [s for symptoms in symptom_lists for s in symptoms]
+        corrected = iter(self.encoder.correct_many(flat))
+
+        rows = []
+        for symptoms in symptom_lists:
+            names = [next(corrected) for _ in symptoms]
+            rows.append([n for n in dict.fromkeys(names) if n is not None])
+        return rows
+
+    def predict_proba(self, symptom_lists):
+        matrix = self.encoder.encode(self.correct(symptom_lists))
+        if self._wrap_frame:
+            matrix = pd.DataFrame(matrix, columns=self.model.feature_names_in_)
+        return self.model.predict_proba(matrix)
+
+    def predict_topk(self, symptom_lists, k=DEFAULT_TOP_K):
+        """``[[(disease, probability), ...], ...]`` with one list per input row."""
+        if not symptom_lists:
+            return []
+
+        proba = self.predict_proba(symptom_lists)
+        k = min(k, proba.shape[1])
+
+        top = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(proba, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(self.labels[j], float(p)) for j, p in zip(row_idx, row_scores)]
+            for row_idx, row_scores in zip(top, top_scores)
+        ]
+
+    def predict(self, symptom_lists):
+        return [row[0][0] for row in self.predict_topk(symptom_lists, k=1)]
+
+
+# -------------------------------------------------
+# CSV input / output
+# -------------------------------------------------
+def _row_symptoms(frame):
+    symptom_columns = [c for c in frame.columns if str(c).startswith("Symptom_")]
+    if symptom_columns:
+        values = frame[symptom_columns].to_numpy(dtype=object)
+        return [[str(v) for v in row if not pd.isna(v) and str(v).strip()] for row in values]
+    if "symptoms" in frame.columns:
+        return [
+            [s for s in str(v).split(",") if s.strip()] if not pd.isna(v) else []
+            for v in frame["symptoms"]
+        ]
+    raise ValueError("Input needs Symptom_* columns or a 'symptoms' column.")
+
+
+def iter_csv_batches(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``(first_row_number, symptom_lists)`` chunks of the input CSV."""
+    start = 0
+    for frame in pd.read_csv(path, chunksize=chunk_size):
+        rows = _row_symptoms(frame)
+        yield start, rows
+        start += len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk disease prediction with top-k probabilities.")
+    parser.add_argument("input", help="CSV shaped like symptoms_df.csv")
+    parser.add_argument("-o", "--output", default="-", help="Output path; '-' for stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    predictor = DiseasePredictor.from_artifacts()
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(out) if args.format == "csv" else None
+        if writer:
+            writer.writerow(["row", "rank", "disease", "probability"])
+
+        for start, symptom_lists in iter_csv_batches(args.input, args.chunk_size):
+            results = predictor.predict_topk(symptom_lists, k=args.top_k)
+            for offset, top in enumerate(results):
+                row = start + offset
+                if writer:
+                    for rank, (disease, p) in enumerate(top, 1):
+                        writer.writerow([row, rank, disease, f"{p:.4f}"])
+                else:
+                    out.write(json.dumps({
+                        "row": row,
+                        "predictions": [
+                            {"disease": d, "probability": round(p, 4)} for d, p in top
+                        ],
+                    }) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Bulk drug recommendations for whole formularies.
+
+Reads drug names (one per line, or a CSV with a ``Drug_Name`` column),
+scores them against the catalogue in blocks of ``vectors[batch] @ vectors.T``
+with per-row argpartition, and streams CSV or JSONL as each block finishes.
+Peak memory is ``block_size x n_drugs`` floats regardless of input size.
+
+    python -m mediguide.drug_batch formulary.txt --top-n 5 --format jsonl -o out.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+from itertools import chain, islice
+
+import numpy as np
+
+from mediguide.drug_bundle import load_drug_artifacts
+from mediguide.drug_neighbors import DEFAULT_BLOCK_SIZE, iter_topk_blocks
+
+
+# -------------------------------------------------
+# Engine
+# -------------------------------------------------
+class BatchRecommender:
+    def __init__(self, lookup, vectors):
+        self.names = lookup.names
+        self.row_of = lookup.row_of
+        self.vectors = vectors
+
+    @classmethod
+    def from_artifacts(cls):
+        artifacts = load_drug_artifacts()
+        return cls(artifacts.lookup, artifacts.vectors)
+
+    def recommend_many(self, drug_names, top_n=5, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Yield ``(drug_name, [(name, score), ...] or None)`` in input order.
+
+        ``None`` means the drug is not in the catalogue. ``drug_names`` may be
+        any iterable, including a lazily read file.
+        """
+        names_iter = iter(drug_names)
+        while True:
+            chunk = list(islice(names_iter, block_size))
+            if not chunk:
+                return
+
+            rows = [self.row_of.get(name) for name in chunk]
+            known = np.array([r for r in rows if r is not None], dtype=np.int64)
+
+            found = {}
+            if len(known):
+                for block, idx, scores in iter_topk_blocks(
+                    self.vectors, known, top_n, block_size=block_size
+                ):
+                    for row, nbr, sc in zip(block, idx, scores):
+                        found[int(row)] = [
+                            (self.names[j], float(s)) for j, s in zip(nbr, sc)
+                        ]
+
+            for name, row in zip(chunk, rows):
+                yield name, (found[row] if row is not None else None)
+
+
+# -------------------------------------------------
+# Input / output
+# -------------------------------------------------
+def read_drug_names(handle, column="Drug_Name"):
+    first = handle.readline()
+    if not first:
+        return
+    header = next(csv.reader([first]))
+
+    if column in header:
+        col = header.index(column)
+        for record in csv.reader(handle):
+            if len(record) > col and record[col].strip():
+                yield record[col].strip()
+    else:
+        for line in chain([first], handle):
+            name = line.strip()
+            if name:
+                yield name
+
+
+def write_csv(results, out):
+    writer = csv.writer(out)
+    writer.writerow(["drug_name", "rank", "recommendation", "score"])
+    for name, recs in results:
+        if recs is None:
+            writer.writerow([name, "", "", ""])
+            continue
+        for rank, (rec, score) in enumerate(recs, 1):
+            writer.writerow([name, rank, rec, f"{score:.6f}"])
+
+
+def write_jsonl(results, out):
+    for name, recs in results:
+        if recs is None:
+            record = {"drug_name": name, "error": "not found"}
+        else:
+            record = {
+                "drug_name": name,
+                "recommendations": [
+                    {"drug_name": rec, "score": round(score, 6)} for rec, score in recs
+                ],
+            }
+        out.write(json.dumps(record) + "\n")
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recommend alternatives for a file of drug names."
+    )
+    parser.add_argument("input", help="Text file (one name per line) or CSV with a Drug_Name column; '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output path; '-' for stdout")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    parser.add_argument("--column", default="Drug_Name")
+    args = parser.parse_args(argv)
+
+    engine = BatchRecommender.from_artifacts()
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        names = read_drug_names(src, column=args.column)
+        results = engine.recommend_many(names, top_n=args.top_n, block_size=args.block_size)
+        WRITERS[args.format](results, out)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
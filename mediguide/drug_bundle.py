@@ -0,0 +1,133 @@
+"""
+Drug Recommendation artifacts as a memory-mappable bundle.
+
+Converts the notebook's pickles (``medicine_df.pkl``, ``tfidf_vectors.pkl``,
+``tfidf_vectorizer.pkl``) plus the description CSV into a bundle under
+``models/bundles/drug``, and loads whichever form is available:
+
+    python -m mediguide.drug_bundle export --version 2026.10
+    python -m mediguide.drug_bundle verify
+"""
+import argparse
+import os
+import pickle
+from collections import namedtuple
+
+import pandas as pd
+
+from mediguide.bundle import BundleError, BundleWriter, load_bundle
+from mediguide.drug_lookup import DESCRIPTION_PATH, DrugLookup, align_descriptions
+from mediguide.drug_neighbors import MODELS_DIR, load_vectors, normalize_vectors
+from mediguide.drug_query import (
+    VECTORIZER_PATH,
+    BundledTfidfVectorizer,
+    DrugQueryIndex,
+    load_vectorizer,
+)
+
+DRUG_BUNDLE_PATH = "models/bundles/drug"
+MEDICINE_PATH = os.path.join(MODELS_DIR, "medicine_df.pkl")
+
+DrugArtifacts = namedtuple("DrugArtifacts", "lookup vectors query_index version")
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def export_drug_bundle(medicine, vectors, vectorizer, description_data,
+                       path=DRUG_BUNDLE_PATH, version="1"):
+    names = medicine["Drug_Name"].to_numpy()
+    vectors = normalize_vectors(vectors)
+    vocabulary, idf, stop_words, config = BundledTfidfVectorizer.export(vectorizer)
+
+    with BundleWriter(path, kind="drug", version=version,
+                      meta={"vectorizer": config, "normalized": True}) as writer:
+        writer.add_strings("names", names)
+        writer.add_strings("descriptions", [
+            "" if pd.isna(d) else d for d in align_descriptions(names, description_data)
+        ])
+        writer.add_sparse("tfidf", vectors, layout="csr")
+        writer.add_sparse("tfidf_postings", vectors, layout="csc")
+        writer.add_strings("vocabulary", vocabulary)
+        writer.add_array("idf", idf)
+        writer.add_strings("stop_words", stop_words)
+
+
+def export_from_pickles(path=DRUG_BUNDLE_PATH, version="1"):
+    with open(MEDICINE_PATH, "rb") as f:
+        medicine = pickle.load(f)
+    with open(os.path.join(MODELS_DIR, "tfidf_vectors.pkl"), "rb") as f:
+        vectors = pickle.load(f)
+    export_drug_bundle(
+        medicine, vectors, load_vectorizer(VECTORIZER_PATH),
+        pd.read_csv(DESCRIPTION_PATH), path=path, version=version,
+    )
+
+
+# -------------------------------------------------
+# Load
+# -------------------------------------------------
+def _from_bundle(bundle):
+    lookup = DrugLookup(bundle["names"].to_numpy(), bundle["descriptions"])
+    vectorizer = BundledTfidfVectorizer(
+        bundle["vocabulary"],
+        bundle["idf"],
+        bundle["stop_words"],
+        bundle.meta["vectorizer"],
+    )
+    return DrugArtifacts(
+        lookup=lookup,
+        vectors=bundle["tfidf"],
+        query_index=DrugQueryIndex(vectorizer, bundle["tfidf_postings"]),
+        version=bundle.version,
+    )
+
+
+def _from_pickles():
+    with open(MEDICINE_PATH, "rb") as f:
+        medicine = pickle.load(f)
+    vectors = load_vectors()
+    return DrugArtifacts(
+        lookup=DrugLookup.from_csv(medicine),
+        vectors=vectors,
+        query_index=DrugQueryIndex(load_vectorizer(), vectors.tocsc()),
+        version="pickle",
+    )
+
+
+def load_drug_artifacts(path=DRUG_BUNDLE_PATH):
+    """Prefer the memory-mapped bundle; fall back to the notebook pickles."""
+    if os.path.exists(path):
+        return _from_bundle(load_bundle(path, kind="drug"))
+    return _from_pickles()
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or check the drug artifact bundle.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Convert the pickles into a bundle")
+    export.add_argument("--path", default=DRUG_BUNDLE_PATH)
+    export.add_argument("--version", default="1")
+
+    verify = sub.add_parser("verify", help="Check bundle checksums")
+    verify.add_argument("--path", default=DRUG_BUNDLE_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_from_pickles(path=args.path, version=args.version)
+        print(f"Drug bundle written to {args.path}")
+    else:
+        try:
+            bundle = load_bundle(args.path, kind="drug", verify=True)
+        except BundleError as e:
+            raise SystemExit(f"Invalid bundle: {e}")
+        print(f"Bundle {args.path} (version {bundle.version}) OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Name -> row and description lookup tables for the drug catalogue.
+
+Built once per process so page reruns never scan or sort the catalogue:
+a hash map from drug name to TF-IDF row, the pre-sorted list of names for
+the selectbox, and a description array aligned with the TF-IDF rows.
+"""
+import pandas as pd
+
+DESCRIPTION_PATH = "data/Drug reccomendation/medicine.csv"
+
+
+def build_row_index(names):
+    """Map each drug name to its first row, matching ``medicine.index[...][0]``."""
+    row_of = {}
+    for row, name in enumerate(names):
+        row_of.setdefault(name, row)
+    return row_of
+
+
+def align_descriptions(names, description_data):
+    """Description of each drug in ``names`` (first non-empty CSV match)."""
+    by_name = (
+        description_data.dropna(subset=["Description"])
+        .drop_duplicates("Drug_Name")
+        .set_index("Drug_Name")["Description"]
+    )
+    return by_name.reindex(names).to_numpy(dtype=object)
+
+
+class DrugLookup:
+    def __init__(self, names, descriptions):
+        self.names = names
+        self.row_of = build_row_index(self.names)
+        self.sorted_names = sorted(self.row_of)
+        self.descriptions = descriptions
+
+    @classmethod
+    def from_frames(cls, medicine, description_data):
+        names = medicine["Drug_Name"].to_numpy()
+        return cls(names, align_descriptions(names, description_data))
+
+    @classmethod
+    def from_csv(cls, medicine, path=DESCRIPTION_PATH):
+        return cls.from_frames(medicine, pd.read_csv(path))
+
+    def row(self, name):
+        return self.row_of.get(name)
+
+    def description(self, name):
+        row = self.row_of.get(name)
+        if row is None:
+            return None
+        value = self.descriptions[row]
+        # Bundled string columns store a missing description as "".
+        return None if pd.isna(value) or value == "" else value
@@ -0,0 +1,160 @@
+"""
+Precomputed top-K neighbor table for the Drug Recommendation page.
+
+The TF-IDF rows produced by the notebook are L2-normalised, so cosine
+similarity is a plain sparse dot product. Instead of scoring every drug
+against all ~9.7k rows on every click, we score everything once offline,
+keep the K best neighbors per row and answer page requests with a slice.
+
+Build the table once after retraining the TF-IDF artifacts:
+
+    python -m mediguide.drug_neighbors --k 50
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+MODELS_DIR = "models/second_feature_models"
+VECTORS_PATH = os.path.join(MODELS_DIR, "tfidf_vectors.pkl")
+NEIGHBOR_IDX_PATH = os.path.join(MODELS_DIR, "neighbors_idx.npy")
+NEIGHBOR_SCORE_PATH = os.path.join(MODELS_DIR, "neighbors_score.npy")
+
+DEFAULT_K = 50
+DEFAULT_BLOCK_SIZE = 512
+
+
+# -------------------------------------------------
+# Blocked top-K scoring
+# -------------------------------------------------
+def normalize_vectors(vectors):
+    # Re-normalise defensively so a dot product is always a cosine. sklearn
+    # is only needed on the pickle path, so it is not imported up front.
+    from sklearn.preprocessing import normalize
+
+    return normalize(vectors.tocsr(), norm="l2", copy=True)
+
+
+def load_vectors(path=VECTORS_PATH):
+    with open(path, "rb") as f:
+        return normalize_vectors(pickle.load(f))
+
+
+def topk_rows(scores, k, exclude=None):
+    """
+    Top-k column indices and scores for every row of a dense score block.
+
+    ``exclude`` optionally holds one column per row (the query drug itself)
+    that must never be returned. Uses argpartition, so the cost per row is
+    O(N + k log k) instead of a full O(N log N) sort.
+    """
+    n_rows, n_cols = scores.shape
+    if exclude is not None:
+        scores[np.arange(n_rows), exclude] = -np.inf
+
+    k = min(k, n_cols - (1 if exclude is not None else 0))
+    if k <= 0:
+        return (np.empty((n_rows, 0), dtype=np.int32),
+                np.empty((n_rows, 0), dtype=np.float32))
+
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+
+    idx = np.take_along_axis(part, order, axis=1).astype(np.int32)
+    top = np.take_along_axis(part_scores, order, axis=1).astype(np.float32)
+    return idx, top
+
+
+def iter_topk_blocks(vectors, rows, k, block_size=DEFAULT_BLOCK_SIZE,
+                     exclude_self=True):
+    """
+    Yield ``(rows_block, idx, scores)`` for ``rows`` in blocks.
+
+    Memory stays bounded by ``block_size x n_drugs`` floats; the dense
+    N x N similarity matrix is never materialised.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    vectors_t = vectors.T.tocsc()
+
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        scores = (vectors[block] @ vectors_t).toarray().astype(np.float32)
+        idx, top = topk_rows(scores, k, exclude=block if exclude_self else None)
+        yield block, idx, top
+
+
+def build_neighbor_table(vectors, k=DEFAULT_K, block_size=DEFAULT_BLOCK_SIZE):
+    n = vectors.shape[0]
+    k = min(k, n - 1)
+    idx_table = np.empty((n, k), dtype=np.int32)
+    score_table = np.empty((n, k), dtype=np.float32)
+
+    for block, idx, top in iter_topk_blocks(vectors, np.arange(n), k, block_size):
+        idx_table[block] = idx
+        score_table[block] = top
+
+    return idx_table, score_table
+
+
+# -------------------------------------------------
+# Persistence
+# -------------------------------------------------
+def save_neighbor_table(idx_table, score_table,
+                        idx_path=NEIGHBOR_IDX_PATH,
+                        score_path=NEIGHBOR_SCORE_PATH):
+    np.save(idx_path, idx_table)
+    np.save(score_path, score_table)
+
+
+def load_neighbor_table(idx_path=NEIGHBOR_IDX_PATH,
+                        score_path=NEIGHBOR_SCORE_PATH,
+                        mmap_mode="r"):
+    return (np.load(idx_path, mmap_mode=mmap_mode),
+            np.load(score_path, mmap_mode=mmap_mode))
+
+
+def load_or_build_neighbor_table(vectors, k=DEFAULT_K):
+    """Load the saved table, or build and save it if it is missing or stale."""
+    if os.path.exists(NEIGHBOR_IDX_PATH) and os.path.exists(NEIGHBOR_SCORE_PATH):
+        idx_table, score_table = load_neighbor_table()
+        if idx_table.shape[0] == vectors.shape[0]:
+            return idx_table, score_table
+
+    idx_table, score_table = build_neighbor_table(normalize_vectors(vectors), k=k)
+    save_neighbor_table(idx_table, score_table)
+    return idx_table, score_table
+
+
+def neighbors(idx_table, score_table, row, top_n):
+    """O(top_n) lookup of the precomputed neighbors of ``row``."""
+    return idx_table[row, :top_n], score_table[row, :top_n]
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precompute the top-K drug neighbor table from tfidf_vectors.pkl."
+    )
+    parser.add_argument("--vectors", default=VECTORS_PATH)
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    vectors = load_vectors(args.vectors)
+    idx_table, score_table = build_neighbor_table(
+        vectors, k=args.k, block_size=args.block_size
+    )
+    save_neighbor_table(idx_table, score_table)
+
+    print(f"Neighbor table: {idx_table.shape} in {time.perf_counter() - start:.1f}s")
+    print(f"Saved to {NEIGHBOR_IDX_PATH} and {NEIGHBOR_SCORE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Free-text "find drugs for my condition" search over the TF-IDF artifacts.
+
+The query is cleaned with the same ``preprocess_text`` lemmatisation used in
+the training notebook, projected with the shipped ``tfidf_vectorizer.pkl``
+and scored through a term -> drug inverted index (the CSC view of the TF-IDF
+matrix). Only the posting lists of the query's terms are touched, so latency
+depends on how common the query terms are, not on the size of the catalogue.
+"""
+import os
+import pickle
+import re
+from collections import Counter
+
+import numpy as np
+
+from mediguide.drug_neighbors import MODELS_DIR
+
+VECTORIZER_PATH = os.path.join(MODELS_DIR, "tfidf_vectorizer.pkl")
+
+
+# -------------------------------------------------
+# Text preprocessing (mirrors the notebook)
+# -------------------------------------------------
+_lemmatizer = None
+
+
+def _lemmatize(word):
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    try:
+        return _lemmatizer.lemmatize(word)
+    except LookupError:
+        # WordNet corpus not downloaded: fall back to the raw token rather
+        # than failing the request. Run `python -m nltk.downloader wordnet`.
+        return word
+
+
+def preprocess_text(text):
+    text = str(text).lower()
+    return " ".join(_lemmatize(word) for word in text.split())
+
+
+# -------------------------------------------------
+# Inverted index search
+# -------------------------------------------------
+def load_vectorizer(path=VECTORIZER_PATH):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class BundledTfidfVectorizer:
+    """
+    Pickle-free replacement for the notebook's ``TfidfVectorizer.transform``.
+
+    Reproduces scikit-learn's default word analyzer (lowercase, token
+    pattern, stop-word removal, word n-grams), raw term counts, idf
+    weighting and L2 normalisation from arrays stored in a drug bundle.
+    """
+
+    CONFIG_KEYS = ("lowercase", "token_pattern", "ngram_range", "norm",
+                   "use_idf", "sublinear_tf")
+
+    def __init__(self, vocabulary, idf, stop_words, config):
+        self.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        self.idf_ = np.asarray(idf, dtype=np.float64)
+        self.stop_words = frozenset(stop_words)
+        self.lowercase = config["lowercase"]
+        self.token_re = re.compile(config["token_pattern"])
+        self.ngram_range = tuple(config["ngram_range"])
+        self.norm = config["norm"]
+        self.use_idf = config["use_idf"]
+        self.sublinear_tf = config["sublinear_tf"]
+
+    @classmethod
+    def export(cls, vectorizer):
+        """Return ``(vocabulary, idf, stop_words, config)`` for a fitted vectorizer."""
+        unsupported = (
+            vectorizer.analyzer != "word"
+            or vectorizer.tokenizer is not None
+            or vectorizer.preprocessor is not None
+            or vectorizer.strip_accents is not None
+            or vectorizer.binary
+        )
+        if unsupported:
+            raise ValueError("Only the default word analyzer can be exported.")
+
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vocabulary))
+        stop_words = sorted(vectorizer.get_stop_words() or ())
+        config = {key: getattr(vectorizer, key) for key in cls.CONFIG_KEYS}
+        config["ngram_range"] = list(config["ngram_range"])
+        return vocabulary, idf, stop_words, config
+
+    def _analyze(self, doc):
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = [t for t in self.token_re.findall(doc) if t not in self.stop_words]
+
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                yield " ".join(tokens[i:i + n])
+
+    def transform(self, docs):
+        from scipy import sparse
+
+        indptr, indices, data = [0], [], []
+        for doc in docs:
+            counts = Counter(
+                self.vocabulary_[term] for term in self._analyze(doc)
+                if term in self.vocabulary_
+            )
+            cols = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+            tf = np.array([counts[c] for c in cols], dtype=np.float64)
+            if self.sublinear_tf:
+                tf = np.log(tf) + 1
+            weights = tf * self.idf_[cols] if self.use_idf else tf
+            if self.norm == "l2" and len(weights):
+                weights /= np.sqrt(np.dot(weights, weights))
+            elif self.norm == "l1" and len(weights):
+                weights /= np.abs(weights).sum()
+
+            indices.append(cols)
+            data.append(weights)
+            indptr.append(indptr[-1] + len(cols))
+
+        return sparse.csr_matrix(
+            (np.concatenate(data) if data else np.empty(0),
+             np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+             np.array(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary_)),
+        )
+
+
+class DrugQueryIndex:
+    def __init__(self, vectorizer, postings):
+        self.vectorizer = vectorizer
+        # Column-major: each column is the posting list of one term.
+        self.postings = postings
+        self.n_drugs = self.postings.shape[0]
+
+    def search(self, text, top_n=5):
+        """Return ``[(row, score), ...]`` for the ``top_n`` best drugs."""
+        query = self.vectorizer.transform([preprocess_text(text)]).tocsr()
+        if query.nnz == 0:
+            return []
+
+        terms = query.indices
+        weights = query.data
+
+        starts = self.postings.indptr[terms]
+        ends = self.postings.indptr[terms + 1]
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return []
+
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        rows = self.postings.indices[positions]
+        contrib = self.postings.data[positions] * np.repeat(weights, lengths)
+
+        candidates, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=contrib)
+
+        k = min(top_n, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(int(candidates[i]), float(scores[i])) for i in top]
@@ -0,0 +1,320 @@
+"""
+Compiled RandomForest for low-latency disease prediction.
+
+The 100 trees of ``RandomForest.pkl`` are flattened into one set of node
+arrays (feature, threshold, children, leaf slot) plus a table of per-leaf
+class probabilities, stored as a memory-mapped bundle.
+
+All 132 symptom features are binary and every split is ``x <= 0.5``, so
+each leaf is also a conjunction "these symptoms present, those absent".
+The exporter packs those conjunctions into 64-bit masks; at load time they
+become one small +1/-1 weight matrix, and the matching leaf of every tree
+is found with a single matrix product instead of walking up to ~50
+levels. Non-binary input falls back to walking the node arrays.
+
+Either way a prediction skips scikit-learn's input validation and joblib
+dispatch, and the app does not need to import scikit-learn at all.
+
+    python -m mediguide.forest export --model models/first_feature_models/RandomForest.pkl
+    python -m mediguide.forest check
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from mediguide.bundle import BundleWriter, load_bundle
+
+FOREST_BUNDLE_PATH = "models/bundles/forest"
+LEAF = -1
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def flatten_forest(model):
+    """Concatenate the fitted trees of ``model`` into flat node arrays."""
+    features, thresholds, lefts, rights, slots, leaf_values, roots = [], [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+
+        # Same normalisation as DecisionTreeClassifier.predict_proba.
+        values = tree.value[:, 0, :].astype(np.float64)
+        totals = values.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1
+        values = values / totals
+
+        node_ids = np.arange(n)
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+        slot = np.full(n, LEAF, dtype=np.int32)
+        slot[is_leaf] = np.arange(is_leaf.sum()) + n_leaves
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(left.astype(np.int32))
+        rights.append(right.astype(np.int32))
+        slots.append(slot)
+        leaf_values.append(values[is_leaf])
+        roots.append(offset)
+
+        offset += n
+        n_leaves += int(is_leaf.sum())
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "leaf_slot": np.concatenate(slots),
+        "leaf_proba": np.concatenate(leaf_values),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+
+def pack_bits(X):
+    """Pack binary rows into little-endian ``uint64`` words, shape ``(n, W)``."""
+    X = np.asarray(X)
+    n_words = -(-X.shape[1] // 64)
+    packed = np.zeros((X.shape[0], n_words * 8), dtype=np.uint8)
+    packed[:, :-(-X.shape[1] // 8)] = np.packbits(X != 0, axis=1, bitorder="little")
+    return packed.view(np.uint64)
+
+
+def unpack_bits(words, n_features):
+    """Inverse of ``pack_bits``: ``float32`` 0/1 matrix of shape ``(n, n_features)``."""
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    bits = np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :n_features]
+    return bits.astype(np.float32)
+
+
+def leaf_conjunctions(model, n_features):
+    """
+    ``(present, absent)`` bitmasks per leaf, in leaf-slot order.
+
+    Only valid when every split threshold lies in (0, 1), i.e. ``x <= t``
+    means "feature is 0" for binary input.
+    """
+    present, absent = [], []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        internal = tree.children_left != -1
+        thresholds = tree.threshold[internal]
+        if not np.all((thresholds > 0) & (thresholds < 1)):
+            return None
+
+        leaves = {}
+        stack = [(0, frozenset(), frozenset())]
+        while stack:
+            node, on, off = stack.pop()
+            if tree.children_left[node] == -1:
+                leaves[node] = (on, off)
+                continue
+            f = tree.feature[node]
+            stack.append((tree.children_left[node], on, off | {f}))
+            stack.append((tree.children_right[node], on | {f}, off))
+
+        for node in sorted(leaves):
+            on, off = leaves[node]
+            row_on = np.zeros(n_features, dtype=bool)
+            row_off = np.zeros(n_features, dtype=bool)
+            row_on[list(on)] = True
+            row_off[list(off)] = True
+            present.append(row_on)
+            absent.append(row_off)
+
+    return pack_bits(np.array(present)), pack_bits(np.array(absent))
+
+
+def export_forest(model, path=FOREST_BUNDLE_PATH, version="1"):
+    arrays = flatten_forest(model)
+    masks = leaf_conjunctions(model, model.n_features_in_)
+    if masks is not None:
+        arrays["leaf_present"], arrays["leaf_absent"] = masks
+    max_depth = max(e.tree_.max_depth for e in model.estimators_)
+
+    with BundleWriter(path, kind="forest", version=version,
+                      meta={"max_depth": int(max_depth),
+                            "n_estimators": len(model.estimators_),
+                            "n_features": int(model.n_features_in_)}) as writer:
+        for name, array in arrays.items():
+            writer.add_array(name, array)
+        writer.add_array("classes", np.asarray(model.classes_))
+        names = getattr(model, "feature_names_in_", None)
+        if names is not None:
+            writer.add_strings("feature_names", list(names))
+
+
+# -------------------------------------------------
+# Inference
+# -------------------------------------------------
+class CompiledForest:
+    """Drop-in for ``RandomForestClassifier.predict`` / ``predict_proba``."""
+
+    # Rows per block; bounds the (rows x leaves) score matrix.
+    BLOCK_ROWS = 512
+    # Up to this many rows, gather weight rows instead of a dense product.
+    SPARSE_ROWS = 8
+
+    def __init__(self, feature, threshold, left, right, leaf_slot, leaf_proba,
+                 roots, classes, max_depth, n_features, feature_names=None,
+                 leaf_present=None, leaf_absent=None):
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.left = np.asarray(left)
+        self.right = np.asarray(right)
+        self.leaf_slot = np.asarray(leaf_slot)
+        self.leaf_proba = leaf_proba
+        self.roots = np.asarray(roots)
+        self.classes_ = np.asarray(classes)
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.feature_names = feature_names
+        self.n_estimators = len(self.roots)
+        self.leaf_present = leaf_present
+        self.leaf_absent = leaf_absent
+        if leaf_present is not None:
+            present = unpack_bits(leaf_present, self.n_features)
+            absent = unpack_bits(leaf_absent, self.n_features)
+            self._weights = np.ascontiguousarray((present - absent).T)
+            self._targets = present.sum(axis=1)
+
+    @classmethod
+    def from_bundle(cls, path=FOREST_BUNDLE_PATH):
+        bundle = load_bundle(path, kind="forest")
+        # The small node arrays are read into RAM for fast fancy indexing;
+        # the larger probability table stays memory-mapped.
+        return cls(
+            feature=np.array(bundle["feature"]),
+            threshold=np.array(bundle["threshold"]),
+            left=np.array(bundle["left"]),
+            right=np.array(bundle["right"]),
+            leaf_slot=np.array(bundle["leaf_slot"]),
+            leaf_proba=bundle["leaf_proba"],
+            roots=np.array(bundle["roots"]),
+            classes=np.array(bundle["classes"]),
+            max_depth=bundle.meta["max_depth"],
+            n_features=bundle.meta["n_features"],
+            feature_names=list(bundle["feature_names"]) if "feature_names" in bundle else None,
+            leaf_present=np.array(bundle["leaf_present"]) if "leaf_present" in bundle else None,
+            leaf_absent=np.array(bundle["leaf_absent"]) if "leaf_absent" in bundle else None,
+        )
+
+    def apply(self, X):
+        """Leaf node id reached in every tree, shape ``(n_rows, n_trees)``."""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_estimators)).copy()
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nxt = np.where(go_left, self.left[nodes], self.right[nodes])
+            if np.array_equal(nxt, nodes):
+                break
+            nodes = nxt
+        return nodes
+
+    def _match_block(self, X):
+        """Bitset path for one block of binary rows."""
+        if len(X) <= self.SPARSE_ROWS:
+            # Few rows with few symptoms each: add up the weight rows of
+            # the present symptoms instead of a dense product.
+            scores = np.stack([self._weights[np.flatnonzero(row)].sum(axis=0) for row in X])
+        else:
+            scores = X.astype(np.float32) @ self._weights
+        # Each satisfied "present" adds 1 and each violated "absent"
+        # subtracts 1, so a leaf matches iff its score hits its target.
+        # Exactly one leaf per tree matches, and leaves are in tree order.
+        _, leaves = np.nonzero(scores == self._targets)
+        return leaves.reshape(-1, self.n_estimators)
+
+    def leaf_slots(self, X):
+        """Leaf-probability row reached in every tree, shape ``(n_rows, n_trees)``."""
+        X = np.asarray(X)
+        binary = self.leaf_present is not None and np.all((X == 0) | (X == 1))
+        if not binary:
+            return self.leaf_slot[self.apply(X)]
+
+        slots = np.empty((X.shape[0], self.n_estimators), dtype=np.int64)
+        for start in range(0, X.shape[0], self.BLOCK_ROWS):
+            block = X[start:start + self.BLOCK_ROWS]
+            slots[start:start + len(block)] = self._match_block(block)
+        return slots
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        proba = np.empty((X.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], self.BLOCK_ROWS):
+            slots = self.leaf_slots(X[start:start + self.BLOCK_ROWS])
+            # Summing over the tree axis adds trees in order, matching
+            # scikit-learn's forest averaging bit for bit.
+            proba[start:start + len(slots)] = self.leaf_proba[slots].sum(axis=1)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def check(model_path, bundle_path, repeats=200):
+    import pandas as pd
+
+    from mediguide.symptoms import TARGET_COLUMN, TRAINING_PATH
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    compiled = CompiledForest.from_bundle(bundle_path)
+
+    X = pd.read_csv(TRAINING_PATH).drop(columns=[TARGET_COLUMN])
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X.to_numpy())
+    same_labels = np.array_equal(model.predict(X), compiled.predict(X.to_numpy()))
+    print(f"Rows: {len(X)}  labels identical: {same_labels}  "
+          f"max |proba diff|: {np.abs(expected - actual).max():.2e}")
+
+    one = X.iloc[:1]
+    one_np = one.to_numpy()
+    for name, fn, arg in [("sklearn", model.predict_proba, one),
+                          ("compiled", compiled.predict_proba, one_np)]:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(arg)
+        print(f"{name:>8}: {(time.perf_counter() - start) / repeats * 1e6:.0f} us / single-row call")
+
+    return same_labels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the disease RandomForest.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Flatten the pickled forest into a bundle")
+    export.add_argument("--model", default="models/first_feature_models/RandomForest.pkl")
+    export.add_argument("--path", default=FOREST_BUNDLE_PATH)
+    export.add_argument("--version", default="1")
+
+    parity = sub.add_parser("check", help="Compare against scikit-learn on Training.csv")
+    parity.add_argument("--model", default="models/first_feature_models/RandomForest.pkl")
+    parity.add_argument("--path", default=FOREST_BUNDLE_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        with open(args.model, "rb") as f:
+            export_forest(pickle.load(f), path=args.path, version=args.version)
+        print(f"Compiled forest written to {args.path}")
+    elif not check(args.model, args.path):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
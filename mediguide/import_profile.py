@@ -0,0 +1,163 @@
+"""
+Import-time profile of each page, to catch startup regressions.
+
+Streamlit re-executes a page script on every rerun, but its module-level
+imports are paid once per worker, on the first visit. For every page this
+collects the module-level ``import`` statements (not those inside
+functions, which are deferred on purpose), runs them in a fresh
+interpreter under ``python -X importtime`` and reports the total, the
+page's slowest direct imports and the slowest modules overall. Each page
+is run ``--repeat`` times and the fastest run kept, so bytecode compilation
+on the first run does not count.
+
+    python -m mediguide.import_profile
+    python -m mediguide.import_profile --budget-ms 1500 --json import_profile.json
+    python -m mediguide.import_profile --module medibot.loaders
+
+With ``--budget-ms`` the exit status is 1 when any page imports slower
+than the budget, so the command can gate CI.
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TOP = 10
+MARKER = "import time: profile start"
+
+
+def page_scripts(root=ROOT):
+    return [os.path.join(root, "Home.py")] + sorted(glob.glob(os.path.join(root, "pages", "*.py")))
+
+
+def module_level_imports(path):
+    """Source of every import statement that runs when ``path`` is executed."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    statements = []
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        else:
+            # Imports inside module-level if / try / with blocks still run.
+            for field in ("body", "orelse", "finalbody", "handlers"):
+                pending.extend(getattr(node, field, []))
+    return statements
+
+
+def _profile_code(statements):
+    # Interpreter start-up and this harness import modules too; only lines
+    # after the marker count. A missing dependency is reported, not fatal.
+    lines = ["import json, sys", f"sys.stderr.write({MARKER!r} + '\\n')", "missing = []"]
+    for statement in statements:
+        lines += ["try:", f"    {statement}",
+                  "except ImportError as e:", f"    missing.append({statement!r} + ': ' + str(e))"]
+    lines.append("print(json.dumps(missing))")
+    return "\n".join(lines)
+
+
+def parse_importtime(stderr):
+    """``(module, depth, self_ms, cumulative_ms)`` for each ``-X importtime`` line."""
+    rows = []
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(parts[0]) / 1000, int(parts[1]) / 1000))
+    return rows
+
+
+def profile_statements(statements, python=sys.executable, root=ROOT):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", _profile_code(statements)],
+        cwd=root, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = parse_importtime(result.stderr)
+    return {
+        "total_ms": sum(row[2] for row in rows),
+        "modules": len(rows),
+        "missing": json.loads(result.stdout.strip().splitlines()[-1]),
+        "rows": rows,
+    }
+
+
+def profile(name, statements, repeat=3, top=DEFAULT_TOP, **kwargs):
+    best = min((profile_statements(statements, **kwargs) for _ in range(max(repeat, 1))),
+               key=lambda run: run["total_ms"])
+    rows = best.pop("rows")
+    direct = sorted((r for r in rows if r[1] == 0), key=lambda r: -r[3])
+    slowest = sorted(rows, key=lambda r: -r[2])
+    best.update(
+        name=name,
+        imports=statements,
+        direct=[{"module": m, "cumulative_ms": c} for m, _, _, c in direct[:top]],
+        slowest=[{"module": m, "self_ms": s} for m, _, s, _ in slowest[:top]],
+    )
+    return best
+
+
+def print_report(report):
+    status = f" (over budget {report['budget_ms']:.0f} ms)" if report.get("over_budget") else ""
+    print(f"{report['name']}: {report['total_ms']:.0f} ms, {report['modules']} modules{status}")
+    for item in report["direct"]:
+        print(f"    {item['cumulative_ms']:8.1f} ms  {item['module']}")
+    if report["missing"]:
+        print("    not installed: " + "; ".join(report["missing"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the import time of each page.")
+    parser.add_argument("--module", action="append", default=[],
+                        help="Profile these modules instead of the pages (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page; the fastest is kept")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Exit with status 1 if any page takes longer than this")
+    parser.add_argument("--json", default=None, help="Write the full report here")
+    args = parser.parse_args(argv)
+
+    if args.module:
+        targets = [(module, [f"import {module}"]) for module in args.module]
+    else:
+        targets = [(os.path.relpath(path, ROOT), module_level_imports(path))
+                   for path in page_scripts()]
+
+    reports = []
+    for name, statements in targets:
+        report = profile(name, statements, repeat=args.repeat, top=args.top)
+        if args.budget_ms is not None:
+            report["budget_ms"] = args.budget_ms
+            report["over_budget"] = report["total_ms"] > args.budget_ms
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Wrote {args.json}")
+    if any(report.get("over_budget") for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
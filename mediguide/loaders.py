@@ -0,0 +1,48 @@
+"""
+Cached artifact loaders for the disease and drug pages.
+
+The ``st.cache_resource`` loaders live here rather than in the page scripts
+so ``mediguide.warmup`` can call the very same functions from a background
+thread at server start: the cache is keyed by function, so whatever the
+warm-up loads is what the first visitor gets. The modules behind each
+loader (pandas, the compiled forest, the drug bundle) are imported inside it.
+"""
+import streamlit as st
+
+from mediguide import metrics
+
+
+@st.cache_resource
+@metrics.timed("artifact_load_ms", page="disease")
+def load_disease_data():
+    from mediguide.disease_info import load_disease_table
+    from mediguide.disease_predictor import DiseasePredictor
+
+    disease_table = load_disease_table()
+    predictor = DiseasePredictor.from_artifacts()
+    return disease_table, predictor
+
+
+@st.cache_resource
+@metrics.timed("artifact_load_ms", page="drug", artifact="models")
+def load_drug_models():
+    from mediguide.drug_bundle import load_drug_artifacts
+
+    # Memory-mapped bundle when exported, notebook pickles otherwise.
+    return load_drug_artifacts()
+
+
+@st.cache_resource
+@metrics.timed("artifact_load_ms", page="drug", artifact="neighbors")
+def load_drug_neighbors(_vectors):
+    from mediguide.drug_neighbors import load_or_build_neighbor_table
+
+    return load_or_build_neighbor_table(_vectors)
+
+
+def warm_disease():
+    load_disease_data()
+
+
+def warm_drug():
+    load_drug_neighbors(load_drug_models().vectors)
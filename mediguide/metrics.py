@@ -0,0 +1,221 @@
+"""
+Process-wide timing and metrics for the MediGuide pages.
+
+One registry per process (Streamlit serves every session from the same
+process) holds counters and latency histograms, keyed by name and labels:
+
+    from mediguide import metrics
+
+    with metrics.timer("disease_predict_ms"):
+        ...
+    @metrics.timed("drug_recommend_ms")
+    def recommend(...): ...
+    metrics.inc("medibot_questions_total", cached="exact")
+
+Histograms use fixed millisecond buckets plus a small window of recent
+samples for p50/p95 in the debug panel. The registry is exported in
+Prometheus text format (``to_prometheus``) or as a JSONL snapshot
+(``write_jsonl``). Setting ``MEDIGUIDE_METRICS_JSONL`` to a file path also
+appends every observation to that file as it happens.
+
+The debug sidebar panel (``render_debug_panel``) is shown when
+``MEDIGUIDE_DEBUG=1`` or the page URL has ``?debug=1``.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+RECENT_SAMPLES = 512
+PREFIX = "mediguide_"
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._sink = None
+        path = os.environ.get("MEDIGUIDE_METRICS_JSONL")
+        if path:
+            self._sink = open(path, "a", encoding="utf-8", buffering=1)
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            self._emit("counter", name, value, labels)
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+            self._emit("histogram", name, value, labels)
+
+    def _emit(self, kind, name, value, labels):
+        if self._sink is not None:
+            self._sink.write(json.dumps({"ts": time.time(), "type": kind, "name": name,
+                                         "value": value, "labels": labels}) + "\n")
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # ---------- Export ----------
+    def snapshot(self):
+        with self._lock:
+            counters = [{"type": "counter", "name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{
+                "type": "histogram", "name": name, "labels": dict(labels),
+                "count": h.count, "sum": h.sum,
+                "mean": h.sum / h.count if h.count else 0.0,
+                "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts)),
+            } for (name, labels), h in sorted(self.histograms.items())]
+        return counters + histograms
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for (n, labels), h in sorted(self.histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cumulative += count
+                        le = labels + (("le", str(bound)),)
+                        lines.append(f"{PREFIX}{name}_bucket{_labels(le)} {cumulative}")
+                    lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {h.sum}")
+                    lines.append(f"{PREFIX}{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        now = time.time()
+        return "".join(json.dumps(dict(item, ts=now)) + "\n" for item in self.snapshot())
+
+    def write_jsonl(self, path):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_jsonl())
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Observe the wall time of the enclosed block, in ms, in histogram ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, (time.perf_counter() - start) * 1000, **labels)
+
+
+def timed(name, **labels):
+    """Decorator form of ``timer``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -------------------------------------------------
+# Streamlit debug panel
+# -------------------------------------------------
+def debug_enabled():
+    import streamlit as st
+
+    if os.environ.get("MEDIGUIDE_DEBUG") == "1":
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def render_debug_panel(registry=REGISTRY):
+    """Sidebar table of every metric plus Prometheus / JSONL downloads."""
+    import streamlit as st
+
+    if not debug_enabled():
+        return
+    with st.sidebar.expander("Debug: metrics", expanded=False):
+        rows = []
+        for item in registry.snapshot():
+            labels = ",".join(f"{k}={v}" for k, v in item["labels"].items())
+            if item["type"] == "counter":
+                rows.append({"metric": item["name"], "labels": labels, "count": item["value"]})
+            else:
+                rows.append({"metric": item["name"], "labels": labels, "count": item["count"],
+                             "mean ms": round(item["mean"], 2), "p50 ms": round(item["p50"], 2),
+                             "p95 ms": round(item["p95"], 2)})
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Nothing recorded yet.")
+        st.download_button("Prometheus", registry.to_prometheus(), "metrics.prom", "text/plain")
+        st.download_button("JSONL", registry.to_jsonl(), "metrics.jsonl", "application/json")
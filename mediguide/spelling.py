@@ -0,0 +1,118 @@
+"""
+Fuzzy symptom spelling correction behind a bounded LRU memo.
+
+Users keep retyping the same misspellings ("headach", "vomitting"), so
+every normalised token's answer, including "no match", is remembered in a
+thread-safe LRU shared by all sessions of the process. Misses go to
+RapidFuzz's ``process.extractOne`` with a ``score_cutoff``, so candidates
+below the threshold are rejected inside the C matcher.
+
+An optional JSON warm-start file maps known misspellings to canonical
+symptom names and is loaded into the cache at startup.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from rapidfuzz import fuzz, process, utils
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_THRESHOLD = 80
+WARM_START_PATH = "data/Disease-Prediction-and-Medical dataset/common_misspellings.json"
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SpellingCorrector:
+    def __init__(self, choices, threshold=DEFAULT_THRESHOLD,
+                 maxsize=DEFAULT_MAXSIZE, warm_start_path=None):
+        self.choices = list(choices)
+        self.threshold = threshold
+        self.cache = LRUCache(maxsize)
+        if warm_start_path and os.path.exists(warm_start_path):
+            self.load_warm_start(warm_start_path)
+
+    def match(self, token):
+        """Uncached RapidFuzz lookup; same scorer and preprocessing as thefuzz."""
+        result = process.extractOne(
+            token,
+            self.choices,
+            scorer=fuzz.WRatio,
+            processor=utils.default_process,
+            score_cutoff=self.threshold,
+        )
+        return result[0] if result else None
+
+    def correct(self, token):
+        """``token`` must already be normalised (see ``normalize_symptom``)."""
+        value = self.cache.get(token)
+        if value is _MISSING:
+            value = self.match(token)
+            self.cache.put(token, value)
+        return value
+
+    def stats(self):
+        return self.cache.stats()
+
+    # ---------- warm start ----------
+    def load_warm_start(self, path):
+        with open(path, encoding="utf-8") as f:
+            known = json.load(f)
+
+        valid = set(self.choices)
+        loaded = 0
+        for token, name in known.items():
+            if name is None or name in valid:
+                self.cache.put(token, name)
+                loaded += 1
+        return loaded
+
+    def save_warm_start(self, path):
+        """Persist the current cache so the next process starts warm."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.cache.items()), f, indent=2, sort_keys=True)
@@ -0,0 +1,105 @@
+"""
+Symptom normalisation and one-hot encoding for disease prediction.
+
+Feature order comes from the header of ``Training.csv`` exactly as pandas
+reads it (the duplicated ``fluid_overload`` column becomes
+``fluid_overload.1``), which is the order the RandomForest was trained on.
+
+Each call handles a whole batch of symptom strings: exact matches go
+through a hash table, and only the distinct misses get one fuzzy lookup
+each, memoised by ``SpellingCorrector``.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from mediguide.spelling import DEFAULT_THRESHOLD, WARM_START_PATH, SpellingCorrector
+
+TRAINING_PATH = "data/Disease-Prediction-and-Medical dataset/Training.csv"
+TARGET_COLUMN = "prognosis"
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_symptom(text):
+    """``" Skin_Rash "`` -> ``"skin rash"``."""
+    return _SPACES.sub(" ", str(text).replace("_", " ")).strip().lower()
+
+
+def load_feature_columns(path=TRAINING_PATH):
+    columns = pd.read_csv(path, nrows=0).columns
+    return [c for c in columns if c != TARGET_COLUMN]
+
+
+class SymptomEncoder:
+    def __init__(self, feature_columns, threshold=DEFAULT_THRESHOLD,
+                 warm_start_path=WARM_START_PATH):
+        # Same mapping as the notebook's ``symptoms_list``.
+        self.symptoms_list = {
+            col.replace("_", " ").lower(): idx
+            for idx, col in enumerate(feature_columns)
+        }
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(feature_columns)
+
+        # Whitespace-insensitive keys for the exact-match fast path.
+        self.exact = {}
+        for name, idx in self.symptoms_list.items():
+            self.exact.setdefault(normalize_symptom(name), name)
+        self.corrector = SpellingCorrector(
+            self.symptoms_list, threshold=threshold, warm_start_path=warm_start_path
+        )
+
+    @classmethod
+    def from_training_csv(cls, path=TRAINING_PATH, **kwargs):
+        return cls(load_feature_columns(path), **kwargs)
+
+    def correct_many(self, symptoms):
+        """Canonical symptom name (or ``None``) for every input string."""
+        tokens = [normalize_symptom(s) for s in symptoms]
+
+        resolved = {}
+        for token in tokens:
+            if token and token not in resolved:
+                resolved[token] = self.exact.get(token)
+
+        for token, name in resolved.items():
+            if name is None:
+                resolved[token] = self.corrector.correct(token)
+
+        return [resolved.get(token) if token else None for token in tokens]
+
+    def correct(self, symptom):
+        return self.correct_many([symptom])[0]
+
+    def encode(self, symptom_lists):
+        """
+        One-hot matrix of shape ``(len(symptom_lists), n_features)``.
+
+        Each inner list holds canonical names (as returned by
+        ``correct_many``); unknown names and ``None`` are ignored.
+        """
+        matrix = np.zeros((len(symptom_lists), self.n_features), dtype=np.float64)
+        rows, cols = [], []
+        for row, symptoms in enumerate(symptom_lists):
+            for name in symptoms:
+                idx = self.symptoms_list.get(name)
+                if idx is not None:
+                    rows.append(row)
+                    cols.append(idx)
+        matrix[rows, cols] = 1
+        return matrix
+
+    def parse(self, text):
+        """Comma-separated user input -> ``(known symptoms, unrecognised tokens)``."""
+        raw = [s for s in (part.strip() for part in text.split(",")) if s]
+        corrected = self.correct_many(raw)
+
+        known, unknown = [], []
+        for token, name in zip(raw, corrected):
+            if name is None:
+                unknown.append(token)
+            elif name not in known:
+                known.append(name)
+        return known, unknown
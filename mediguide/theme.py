@@ -0,0 +1,214 @@
+"""
+Shared page styling for Home and the three pages.
+
+Each page used to re-read ``utils/medical_bg.jpg``, base64-encode it and
+inject the ~1.7 MB data URI on every Streamlit rerun. Instead:
+
+- the background is downscaled and re-encoded (WebP, else JPEG) once into
+  ``static/`` and served by Streamlit's static file server
+  (``server.enableStaticServing`` in ``.streamlit/config.toml``), so the
+  browser fetches and caches it once;
+- the CSS for each (page, theme) pair is built once per process and only
+  the small stylesheet is sent on rerun.
+
+If static serving is turned off, the optimised image is inlined as a data
+URI instead (still far smaller than the original).
+
+    python -m mediguide.theme   # pre-build the optimised background
+"""
+import base64
+import functools
+import os
+import shutil
+
+BACKGROUND_SOURCE = "utils/medical_bg.jpg"
+STATIC_DIR = "static"
+STATIC_URL = "app/static"
+BACKGROUND_MAX_WIDTH = 1920
+BACKGROUND_QUALITY = 70
+
+DARK_OVERLAY = "rgba(15,23,42,0.85)"
+LIGHT_OVERLAY = {
+    "home": "rgba(255,255,255,0.78)",
+    "disease": "rgba(255,255,255,0.85)",
+    "drug": "rgba(255,255,255,0.85)",
+    "medibot": "rgba(255,255,255,0.78)",
+}
+
+BACKGROUND_CSS = """
+.stApp {{
+    background:
+        linear-gradient({overlay}, {overlay}),
+        url("{background}");
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+    {color_rule}
+}}
+"""
+
+PAGE_CSS = {
+    "home": """
+.hero-title {{
+    font-size: 46px;
+    font-weight: 600;
+    text-align: center;
+    color: #1f77ff;
+    margin-bottom: 10px;
+}}
+
+.section-card {{
+    background: {card_bg};
+    padding: 24px;
+    border-radius: 16px;
+    box-shadow: 0 12px 30px rgba(0,0,0,0.12);
+    transition: all 0.3s ease;
+    height: 100%;
+    color: {text_color};
+}}
+
+.section-card:hover {{
+    transform: translateY(-6px) scale(1.01);
+    box-shadow: 0 22px 40px rgba(0,0,0,0.25);
+}}
+
+.section-card h3 {{
+    color: #1f77ff;
+    margin-bottom: 10px;
+}}
+
+.footer {{
+    text-align: center;
+    font-size: 14px;
+    color: #9ca3af;
+    margin-top: 40px;
+}}
+""",
+    "disease": """
+textarea, input {{
+    background-color: #f3f4f6 !important;
+    color: #111827 !important;
+}}
+
+textarea::placeholder, input::placeholder {{
+    color: #6b7280 !important;
+    opacity: 1;
+}}
+""",
+    "drug": """
+.card {{
+    background: {card_bg};
+    padding: 22px;
+    border-radius: 16px;
+    margin-bottom: 18px;
+    box-shadow: 0 12px 30px rgba(0,0,0,0.15);
+}}
+
+h1, h2, h3 {{
+    color: #1f77ff;
+}}
+""",
+    "medibot": """
+.card {{
+    background: {card_bg};
+    padding: 22px;
+    border-radius: 16px;
+    box-shadow: 0 12px 30px rgba(0,0,0,0.12);
+    margin-bottom: 18px;
+    color: {text_color};
+}}
+
+h1, h2, h3 {{
+    color: #1f77ff;
+}}
+""",
+}
+
+# The disease page has no theme toggle and leaves the text colour alone.
+PAGES_WITHOUT_TEXT_COLOR = {"disease"}
+
+
+# -------------------------------------------------
+# Background asset
+# -------------------------------------------------
+def optimize_background(source=BACKGROUND_SOURCE, static_dir=STATIC_DIR,
+                        max_width=BACKGROUND_MAX_WIDTH, quality=BACKGROUND_QUALITY):
+    """Write a downscaled copy of ``source`` into ``static_dir`` once; return its path."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    try:
+        from PIL import Image, features
+    except ImportError:
+        Image = None
+
+    if Image is None:
+        # Without Pillow, serve the original file as-is.
+        ext = os.path.splitext(source)[1].lstrip(".")
+    else:
+        ext = "webp" if features.check("webp") else "jpg"
+    target = os.path.join(static_dir, f"{stem}.{ext}")
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return target
+
+    os.makedirs(static_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    if Image is None:
+        shutil.copyfile(source, tmp)
+    else:
+        image = Image.open(source).convert("RGB")
+        if image.width > max_width:
+            image.thumbnail((max_width, image.height), Image.LANCZOS)
+        image.save(tmp, format="WEBP" if ext == "webp" else "JPEG",
+                   quality=quality, optimize=True)
+    os.replace(tmp, target)  # atomic, so concurrent workers never see half a file
+    return target
+
+
+def _static_serving_enabled():
+    try:
+        import streamlit as st
+
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def background_url(source=BACKGROUND_SOURCE):
+    path = optimize_background(source)
+    if _static_serving_enabled():
+        return f"{STATIC_URL}/{os.path.basename(path)}"
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    mime = "image/webp" if path.endswith(".webp") else "image/jpeg"
+    return f"data:{mime};base64,{encoded}"
+
+
+# -------------------------------------------------
+# CSS
+# -------------------------------------------------
+def palette(page, dark=False):
+    return {
+        "overlay": DARK_OVERLAY if dark else LIGHT_OVERLAY[page],
+        "text_color": "#e5e7eb" if dark else "#111827",
+        "card_bg": "#020617" if dark else "#ffffff",
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def page_css(page, dark=False, source=BACKGROUND_SOURCE):
+    colors = palette(page, dark)
+    color_rule = "" if page in PAGES_WITHOUT_TEXT_COLOR else f"color: {colors['text_color']};"
+    css = BACKGROUND_CSS.format(background=background_url(source), color_rule=color_rule, **colors)
+    css += PAGE_CSS[page].format(**colors)
+    return f"<style>{css}</style>"
+
+
+def apply_theme(page, dark=False):
+    """Inject the cached stylesheet for ``page`` in the light or dark theme."""
+    import streamlit as st
+
+    st.markdown(page_css(page, bool(dark)), unsafe_allow_html=True)
+
+
+if __name__ == "__main__":
+    print(optimize_background())
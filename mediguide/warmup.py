@@ -0,0 +1,97 @@
+"""
+Background warm-up of every page's cached artifacts.
+
+The first visitor to a fresh worker used to pay for importing langchain,
+FAISS and the embedding backend and loading the vectorstore, forest and
+drug bundle. ``start`` runs each page's warm function on its own daemon
+thread instead; because the pages call the same ``st.cache_resource``
+functions (``mediguide.loaders``, ``medibot.loaders``), a request that
+arrives mid-warm-up waits on the load already in flight rather than
+starting another.
+
+Start the server with warm-up kicked off before the first request:
+
+    python -m mediguide.warmup Home.py --server.port 8501
+
+Every page also calls ``start()``, so under a plain ``streamlit run`` the
+first session on any page warms the others. ``MEDIGUIDE_WARMUP=0`` turns
+it off. Each target's duration is recorded as ``warmup_ms`` in
+``mediguide.metrics``.
+"""
+import importlib
+import os
+import sys
+import threading
+
+from mediguide import metrics
+
+# "module:function" per page, slowest first.
+TARGETS = (
+    "medibot.loaders:warm_medibot",
+    "mediguide.loaders:warm_disease",
+    "mediguide.loaders:warm_drug",
+)
+
+_lock = threading.Lock()
+_threads = {}
+_status = {}
+
+
+def enabled():
+    return os.environ.get("MEDIGUIDE_WARMUP", "1") != "0"
+
+
+def _warm(target):
+    _status[target] = "running"
+    try:
+        with metrics.timer("warmup_ms", target=target):
+            module, function = target.split(":")
+            getattr(importlib.import_module(module), function)()
+    except Exception as e:  # a page that fails here will show the error itself
+        metrics.inc("warmup_failures_total", target=target)
+        _status[target] = f"failed: {e}"
+    else:
+        _status[target] = "done"
+
+
+def start(targets=TARGETS):
+    """Warm ``targets`` on background threads; later calls are no-ops."""
+    if not enabled():
+        return
+    with _lock:
+        for target in targets:
+            if target in _threads:
+                continue
+            _status[target] = "pending"
+            thread = threading.Thread(target=_warm, args=(target,),
+                                      name=f"warmup-{target}", daemon=True)
+            _threads[target] = thread
+            thread.start()
+
+
+def status():
+    return dict(_status)
+
+
+def wait(timeout=None):
+    for thread in list(_threads.values()):
+        thread.join(timeout)
+    return status()
+
+
+def main(argv=None):
+    """``streamlit run`` with warm-up started before the server accepts requests."""
+    from streamlit.web import cli
+
+    # Under ``python -m`` this file runs as ``__main__``; start the threads
+    # on the imported module so the pages' start() and status() share them.
+    from mediguide import warmup
+
+    argv = list(sys.argv[1:] if argv is None else argv) or ["Home.py"]
+    warmup.start()
+    sys.argv = ["streamlit", "run", *argv]
+    cli.main()
+
+
+if __name__ == "__main__":
+    main()
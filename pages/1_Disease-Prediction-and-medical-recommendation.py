@@ -1,10 +1,9 @@
 import streamlit as st
-import pickle
-import pandas as pd
-import numpy as np
-from thefuzz import process
-import ast
-import base64
+
+from mediguide import metrics, warmup
+from mediguide.disease_info import get_disease_info
+from mediguide.loaders import load_disease_data
+from mediguide.theme import apply_theme
 
 # ------------------------ -------------------------
 # Page Config
@@ -17,37 +16,8 @@ st.set_page_config(
 # -------------------------------------------------
 # Background (ONLY visual layer)
 # -------------------------------------------------
-def set_bg_from_local(image_path):
-    with open(image_path, "rb") as img_file:
-        encoded = base64.b64encode(img_file.read()).decode()
-
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background:
-                linear-gradient(rgba(255,255,255,0.85), rgba(255,255,255,0.85)),
-                url("data:image/jpg;base64,{encoded}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }}
-
-        textarea, input {{
-            background-color: #f3f4f6 !important;
-            color: #111827 !important;
-        }}
-
-        textarea::placeholder, input::placeholder {{
-            color: #6b7280 !important;
-            opacity: 1;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-set_bg_from_local("utils/medical_bg.jpg")
+with metrics.timer("page_style_ms", page="disease"):
+    apply_theme("disease")
 
 # -------------------------------------------------
 # Sidebar
@@ -60,31 +30,26 @@ st.sidebar.markdown(
 )
 
 # -------------------------------------------------
-# Data Loader
+# Data Loader (shared with the background warm-up)
 # -------------------------------------------------
-@st.cache_resource
-def load_data():
-    sym_des = pd.read_csv("data/Disease-Prediction-and-Medical dataset/symptoms_df.csv")
-    precautions = pd.read_csv("data/Disease-Prediction-and-Medical dataset/precautions_df.csv")
-    workout = pd.read_csv("data/Disease-Prediction-and-Medical dataset/workout_df.csv")
-    description = pd.read_csv("data/Disease-Prediction-and-Medical dataset/description.csv")
-    medications = pd.read_csv("data/Disease-Prediction-and-Medical dataset/medications.csv")
-    diets = pd.read_csv("data/Disease-Prediction-and-Medical dataset/diets.csv")
-    model = pickle.load(open('models/first_feature_models/RandomForest.pkl', 'rb'))
-    return sym_des, precautions, workout, description, medications, diets, model
-
-sym_des, precautions, workout, description, medications, diets, model = load_data()
-disease_names = list(description['Disease'].unique())
+warmup.start()
+disease_table, predictor = load_disease_data()
+disease_names = [info.name for info in disease_table.values()]
+
+encoder = predictor.encoder
 
 # -------------------------------------------------
-# KEEP ALL YOUR EXISTING:
-# - symptoms_list
-# - diseases_list
-# - symptoms_list_processed
-# - information()
-# - predicted_value()
-# - correct_spelling()
+# Helpers
 # -------------------------------------------------
+@metrics.timed("disease_predict_ms")
+def predicted_value(patient_symptoms, top_k=3):
+    return predictor.predict_topk([patient_symptoms], k=top_k)[0]
+
+def information(disease):
+    info = get_disease_info(disease_table, disease)
+    if info is None:
+        return "", (), (), (), ()
+    return info.description, info.precautions, info.medications, info.diet, info.workout
 
 # -------------------------------------------------
 # UI
@@ -101,14 +66,21 @@ user_input = st.text_area(
 
 if st.button("Predict Disease"):
     if user_input:
-        patient_symptoms = [s.strip().lower() for s in user_input.split(',')]
-        patient_symptoms = [correct_spelling(s) for s in patient_symptoms if correct_spelling(s)]
+        with metrics.timer("symptom_parse_ms"):
+            patient_symptoms, unrecognised = encoder.parse(user_input)
+        metrics.inc("symptoms_unrecognised_total", len(unrecognised))
+        if unrecognised:
+            st.info("Not recognised: " + ", ".join(unrecognised))
 
         if patient_symptoms:
-            predicted_disease = predicted_value(patient_symptoms)
+            top = predicted_value(patient_symptoms)
+            predicted_disease = top[0][0]
             dis_des, prec, meds, diet, work = information(predicted_disease)
 
             st.success(f"**Predicted Disease:** {predicted_disease}")
+            others = [f"{d} ({p:.0%})" for d, p in top[1:] if p > 0]
+            if others:
+                st.caption("Other possibilities: " + ", ".join(others))
             st.write(f"**Description:** {dis_des}")
             st.write("**Precautions:**", ", ".join(p for p in prec if p))
             st.write("**Medications:**", ", ".join(m for m in meds if m))
@@ -145,3 +117,5 @@ if disease_query:
         st.write("**Recommended Workout:**", ", ".join(w for w in work if w))
     else:
         st.warning("No matching disease found. Try a different name.")
+
+metrics.render_debug_panel()
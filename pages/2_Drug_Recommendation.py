@@ -1,9 +1,9 @@
 import streamlit as st
-import pandas as pd
-import pickle
-import base64
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+from mediguide import metrics, warmup
+from mediguide.drug_neighbors import neighbors
+from mediguide.loaders import load_drug_models, load_drug_neighbors
+from mediguide.theme import apply_theme
 
 # -------------------------------------------------
 # Page Config
@@ -18,47 +18,11 @@ st.set_page_config(
 # -------------------------------------------------
 theme = st.toggle("Dark Mode")
 
-overlay = "rgba(15,23,42,0.85)" if theme else "rgba(255,255,255,0.85)"
-text_color = "#e5e7eb" if theme else "#111827"
-card_bg = "#020617" if theme else "#ffffff"
-
 # -------------------------------------------------
-# Background Loader
+# Background + CSS (cached per theme, image served statically)
 # -------------------------------------------------
-def set_bg_from_local(image_path):
-    with open(image_path, "rb") as img_file:
-        encoded = base64.b64encode(img_file.read()).decode()
-
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background:
-                linear-gradient({overlay}, {overlay}),
-                url("data:image/jpg;base64,{encoded}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-            color: {text_color};
-        }}
-
-        .card {{
-            background: {card_bg};
-            padding: 22px;
-            border-radius: 16px;
-            margin-bottom: 18px;
-            box-shadow: 0 12px 30px rgba(0,0,0,0.15);
-        }}
-
-        h1, h2, h3 {{
-            color: #1f77ff;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-set_bg_from_local("utils/medical_bg.jpg")
+with metrics.timer("page_style_ms", page="drug"):
+    apply_theme("drug", dark=theme)
 
 # -------------------------------------------------
 # Sidebar
@@ -69,113 +33,142 @@ with st.sidebar:
     st.markdown(
         """
         This system recommends **alternative medicines**
-        using **TF-IDF + cosine similarity**.
+        using **TF-IDF + cosine similarity**, or finds
+        drugs from a free-text description of a condition.
         """
     )
 
 # -------------------------------------------------
-# Load Artifacts (CORRECT WAY)
+# Load Artifacts (shared with the background warm-up)
 # -------------------------------------------------
-@st.cache_resource
-def load_models():
-    medicine = pickle.load(
-        open("models/second_feature_models/medicine_df.pkl", "rb")
-    )
-    vectors = pickle.load(
-        open("models/second_feature_models/tfidf_vectors.pkl", "rb")
-    )
-    return medicine, vectors
-
-@st.cache_data
-def load_description_data():
-    return pd.read_csv("data/Drug reccomendation/medicine.csv")
-
-medicine, vectors = load_models()
-description_data = load_description_data()
+warmup.start()
+artifacts = load_drug_models()
+lookup = artifacts.lookup
+query_index = artifacts.query_index
+neighbor_idx, neighbor_scores = load_drug_neighbors(artifacts.vectors)
 
 # -------------------------------------------------
 # Recommendation Logic (ON-DEMAND)
 # -------------------------------------------------
+@metrics.timed("drug_recommend_ms")
 def recommend(drug_name, top_n=5):
-    if drug_name not in medicine["Drug_Name"].values:
+    idx = lookup.row(drug_name)
+    if idx is None:
         return []
 
-    idx = medicine.index[medicine["Drug_Name"] == drug_name][0]
-    scores = cosine_similarity(vectors[idx], vectors).flatten()
-    top_indices = np.argsort(scores)[::-1][1:top_n + 1]
+    top_indices, _ = neighbors(neighbor_idx, neighbor_scores, idx, top_n)
 
-    return medicine.iloc[top_indices]["Drug_Name"].tolist()
+    return lookup.names[top_indices].tolist()
 
-# -------------------------------------------------
-# Title
-# -------------------------------------------------
-st.markdown("<h1>Drug Recommendation System</h1>", unsafe_allow_html=True)
+@metrics.timed("drug_search_ms")
+def search_condition(text, top_n=5):
+    hits = query_index.search(text, top_n=top_n)
+    return [lookup.names[row] for row, _ in hits]
 
 # -------------------------------------------------
-# Search Section
+# Result Cards
 # -------------------------------------------------
-st.markdown("<div class='card'><h3>Find Similar Drugs</h3></div>",
-            unsafe_allow_html=True)
+def render_results(results, heading):
+    st.markdown(
+        f"<div class='card'><h3>{heading}</h3></div>",
+        unsafe_allow_html=True
+    )
 
-selected_medicine = st.selectbox(
-    "Select a medicine",
-    sorted(medicine["Drug_Name"].values)
-)
+    for drug in results:
+        buy_link = f"https://pharmeasy.in/search/all?name={drug}"
 
-recommend_btn = st.button("Recommend")
+        st.markdown(
+            f"""
+            <div class='card'>
+                <b>{drug}</b><br><br>
+                <a href="{buy_link}" target="_blank"
+                   style="
+                   background:#28a745;
+                   color:white;
+                   padding:8px 14px;
+                   border-radius:8px;
+                   text-decoration:none;">
+                   Buy Now
+                </a>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
 # -------------------------------------------------
-# Description Section
+# Title
 # -------------------------------------------------
-desc = description_data.loc[
-    description_data["Drug_Name"] == selected_medicine, "Description"
-]
+st.markdown("<h1>Drug Recommendation System</h1>", unsafe_allow_html=True)
 
-if not desc.empty:
-    st.markdown(
-        f"""
-        <div class='card'>
-            <h3>Description</h3>
-            {desc.values[0]}
-        </div>
-        """,
-        unsafe_allow_html=True
+mode = st.radio(
+    "Search mode",
+    ["Find similar drugs", "Find drugs for my condition"],
+    horizontal=True
+)
+
+if mode == "Find similar drugs":
+    # -------------------------------------------------
+    # Search Section
+    # -------------------------------------------------
+    st.markdown("<div class='card'><h3>Find Similar Drugs</h3></div>",
+                unsafe_allow_html=True)
+
+    selected_medicine = st.selectbox(
+        "Select a medicine",
+        lookup.sorted_names
     )
 
-# -------------------------------------------------
-# Results
-# -------------------------------------------------
-if recommend_btn:
-    results = recommend(selected_medicine)
+    recommend_btn = st.button("Recommend")
+
+    # -------------------------------------------------
+    # Description Section
+    # -------------------------------------------------
+    desc = lookup.description(selected_medicine)
 
-    if results:
+    if desc is not None:
         st.markdown(
-            "<div class='card'><h3>Recommended Alternatives</h3></div>",
+            f"""
+            <div class='card'>
+                <h3>Description</h3>
+                {desc}
+            </div>
+            """,
             unsafe_allow_html=True
         )
 
-        for drug in results:
-            buy_link = f"https://pharmeasy.in/search/all?name={drug}"
-
-            st.markdown(
-                f"""
-                <div class='card'>
-                    <b>{drug}</b><br><br>
-                    <a href="{buy_link}" target="_blank"
-                       style="
-                       background:#28a745;
-                       color:white;
-                       padding:8px 14px;
-                       border-radius:8px;
-                       text-decoration:none;">
-                       Buy Now
-                    </a>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-    else:
-        st.error("No recommendations found.")
+    # -------------------------------------------------
+    # Results
+    # -------------------------------------------------
+    if recommend_btn:
+        results = recommend(selected_medicine)
+
+        if results:
+            render_results(results, "Recommended Alternatives")
+        else:
+            st.error("No recommendations found.")
+
+else:
+    # -------------------------------------------------
+    # Condition Search Section
+    # -------------------------------------------------
+    st.markdown("<div class='card'><h3>Find Drugs for a Condition</h3></div>",
+                unsafe_allow_html=True)
+
+    condition = st.text_input(
+        "Describe the condition or reason",
+        placeholder="e.g., acne with blackheads, dry cough, fungal skin infection"
+    )
+
+    if st.button("Search") or condition:
+        if condition.strip():
+            results = search_condition(condition)
+
+            if results:
+                render_results(results, "Matching Drugs")
+            else:
+                st.error("No drugs matched that description.")
+        else:
+            st.warning("Please describe a condition.")
 
 # -------------------------------------------------
 # Footer
@@ -189,3 +182,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+metrics.render_debug_panel()
@@ -9,11 +9,11 @@ os.environ["TRANSFORMERS_OFFLINE"] = "1"
 # ============================
 # STANDARD IMPORTS
 # ============================
-import asyncio
 import nest_asyncio
 import streamlit as st
-import base64
-from dotenv import load_dotenv, find_dotenv
+
+from mediguide import metrics, warmup
+from mediguide.theme import apply_theme
 
 # ============================
 # PAGE CONFIG
@@ -28,48 +28,11 @@ st.set_page_config(
 # ============================
 theme = st.toggle("Dark Mode")
 
-overlay = "rgba(15,23,42,0.85)" if theme else "rgba(255,255,255,0.78)"
-text_color = "#e5e7eb" if theme else "#111827"
-card_bg = "#020617" if theme else "#ffffff"
-
 # ============================
-# BACKGROUND
+# BACKGROUND + CSS (cached per theme, image served statically)
 # ============================
-def set_bg(image_path):
-    with open(image_path, "rb") as img:
-        encoded = base64.b64encode(img.read()).decode()
-
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background:
-                linear-gradient({overlay}, {overlay}),
-                url("data:image/jpg;base64,{encoded}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-            color: {text_color};
-        }}
-
-        .card {{
-            background: {card_bg};
-            padding: 22px;
-            border-radius: 16px;
-            box-shadow: 0 12px 30px rgba(0,0,0,0.12);
-            margin-bottom: 18px;
-            color: {text_color};
-        }}
-
-        h1, h2, h3 {{
-            color: #1f77ff;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-set_bg("utils/medical_bg.jpg")
+with metrics.timer("page_style_ms", page="medibot"):
+    apply_theme("medibot", dark=theme)
 
 # ============================
 # SIDEBAR
@@ -88,48 +51,28 @@ with st.sidebar:
     )
 
 # ============================
-# LANGCHAIN IMPORTS
+# LOADERS (langchain, FAISS and the embedding
+# backend are imported inside, off the page path)
 # ============================
-from langchain_groq import ChatGroq
-from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_huggingface import HuggingFaceEmbeddings
+from medibot.loaders import ensure_event_loop, groq_api_key, load_chain, load_vectorstore
+
+warmup.start()
 
 # ============================
 # ENV SETUP
 # ============================
-load_dotenv(find_dotenv())
 nest_asyncio.apply()
+ensure_event_loop()
 
-try:
-    asyncio.get_running_loop()
-except RuntimeError:
-    asyncio.set_event_loop(asyncio.new_event_loop())
-
-DB_FAISS_PATH = "vectorstore/db_faiss"
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
+GROQ_API_KEY = groq_api_key()
 
 if not GROQ_API_KEY:
     st.error("GROQ_API_KEY is missing. Please set it in your environment.")
     st.stop()
 
 # ============================
-# VECTORSTORE (OFFLINE SAFE)
+# VECTORSTORE + QA CHAIN (ONE PER PROCESS)
 # ============================
-@st.cache_resource
-def load_vectorstore():
-    embedding_model = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={"local_files_only": True}
-    )
-
-    return FAISS.load_local(
-        DB_FAISS_PATH,
-        embedding_model,
-        allow_dangerous_deserialization=True
-    )
-
 try:
     vectorstore = load_vectorstore()
 except Exception as e:
@@ -137,40 +80,59 @@ except Exception as e:
     st.error(str(e))
     st.stop()
 
+chain = load_chain(GROQ_API_KEY)
+
 # ============================
-# PROMPT
+# CHAT RENDERING
 # ============================
-def get_prompt_template():
-    return PromptTemplate(
-        template="""
-Answer the medical question using ONLY the context below.
-If the answer is not present, say "I don't know".
-
-Context:
-{context}
-
-Question:
-{question}
+TIMING_LABELS = [
+    ("embed", "embed"),
+    ("search", "search"),
+    ("bm25", "BM25"),
+    ("fuse", "fuse"),
+    ("compress", "compress"),
+    ("first_token", "first token"),
+    ("llm", "LLM"),
+    ("total", "total"),
+]
 
-Answer:
-""",
-        input_variables=["context", "question"]
+def render_question(question):
+    st.markdown(
+        f"<div class='card'><b>You</b><br>{question}</div>",
+        unsafe_allow_html=True
     )
 
-# ============================
-# LLM (GROQ)
-# ============================
-def load_llm():
-    return ChatGroq(
-        temperature=0.5,
-        model_name="llama-3.3-70b-versatile",
-        api_key=GROQ_API_KEY
+def render_answer(answer, target=st):
+    target.markdown(
+        f"<div class='card'><b>Medibot</b><br>{answer}</div>",
+        unsafe_allow_html=True
     )
 
+def render_timings(timings, cached=None):
+    parts = [
+        f"{label} {timings[key]:.0f} ms"
+        for key, label in TIMING_LABELS if key in timings
+    ]
+    if cached:
+        parts.append(f"{cached} cache hit")
+    if parts:
+        st.caption(" · ".join(parts))
+
+def render_sources(sources):
+    with st.expander("Source Medical Text Used"):
+        for i, src in enumerate(sources, 1):
+            st.markdown(
+                f"<div class='card'><b>Source {i}</b><br>{src}</div>",
+                unsafe_allow_html=True
+            )
+
 # ============================
 # MAIN APP
 # ============================
 def main():
+    # Already imported by load_vectorstore(); kept off the page's import path.
+    from medibot.batch_embedder import BatchingEmbedder
+
     st.title("Medibot – AI Health Assistant")
 
     st.markdown(
@@ -178,53 +140,79 @@ def main():
         "_No guessing. No hallucinations._"
     )
 
+    streaming = st.sidebar.toggle("Stream answers", value=True)
+
+    if chain.cache is not None:
+        stats = chain.cache.stats()
+        st.sidebar.caption(
+            f"Answer cache: {stats['entries']} entries · "
+            f"{stats['exact_hits']} exact / {stats['semantic_hits']} semantic hits · "
+            f"{stats['hit_rate']:.0%} hit rate"
+        )
+    if isinstance(vectorstore.embeddings, BatchingEmbedder):
+        stats = vectorstore.embeddings.stats()
+        st.sidebar.caption(
+            f"Query embedding: {stats['queries']} queries in {stats['batches']} batches "
+            f"(largest {stats['largest_batch']})"
+        )
+
     # ---------- SESSION STATE ----------
     if "history" not in st.session_state:
         st.session_state.history = []
 
     # ---------- CHAT HISTORY ----------
     for chat in st.session_state.history:
-        st.markdown(
-            f"<div class='card'><b>You</b><br>{chat['question']}</div>",
-            unsafe_allow_html=True
-        )
-        st.markdown(
-            f"<div class='card'><b>Medibot</b><br>{chat['answer']}</div>",
-            unsafe_allow_html=True
-        )
-
-        with st.expander("Source Medical Text Used"):
-            for i, src in enumerate(chat["sources"], 1):
-                st.markdown(
-                    f"<div class='card'><b>Source {i}</b><br>{src}</div>",
-                    unsafe_allow_html=True
-                )
+        render_question(chat["question"])
+        render_answer(chat["answer"])
+        render_timings(chat.get("timings", {}), chat.get("cached"))
+        render_sources(chat["sources"])
 
     # ---------- USER INPUT ----------
     user_query = st.chat_input("Type your medical query...")
 
-    if user_query:
+    if user_query and streaming:
+        try:
+            render_question(user_query)
+
+            with st.spinner("Searching medical textbooks..."):
+                response = chain.stream(user_query)
+
+            # Sources are known before the model starts writing.
+            answer_slot = st.empty()
+            render_sources(response.sources)
+
+            answer = ""
+            for token in response.tokens:
+                answer += token
+                render_answer(answer + "▌", answer_slot)
+            answer = answer or "No response generated."
+            render_answer(answer, answer_slot)
+            render_timings(response.timings, response.cached)
+
+            # Already on screen: no rerun needed, the next one replays history.
+            st.session_state.history.append({
+                "question": user_query,
+                "answer": answer,
+                "sources": response.sources,
+                "timings": response.timings,
+                "cached": response.cached
+            })
+
+        except Exception as e:
+            st.error("Error while generating response")
+            st.error(str(e))
+
+    elif user_query:
         with st.spinner("Searching medical textbooks..."):
             try:
-                qa_chain = RetrievalQA.from_chain_type(
-                    llm=load_llm(),
-                    chain_type="stuff",
-                    retriever=vectorstore.as_retriever(search_kwargs={"k": 5}),
-                    return_source_documents=True,
-                    chain_type_kwargs={"prompt": get_prompt_template()}
-                )
-
-                response = qa_chain.invoke({"query": user_query})
-
-                answer = response.get("result", "No response generated.")
-                source_docs = response.get("source_documents", [])
-
-                sources_text = [doc.page_content for doc in source_docs]
+                response = chain.ask(user_query)
 
                 st.session_state.history.append({
                     "question": user_query,
-                    "answer": answer,
-                    "sources": sources_text
+                    "answer": response.text,
+                    "sources": response.sources,
+                    "timings": response.timings,
+                    "cached": response.cached
                 })
 
                 st.rerun()
@@ -239,3 +227,4 @@ def main():
 # ============================
 if __name__ == "__main__":
     main()
+    metrics.render_debug_panel()
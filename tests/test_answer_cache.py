@@ -0,0 +1,36 @@
+import json
+import os
+
+import numpy as np
+
+from medibot.answer_cache import CACHE_FILE, AnswerCache
+
+
+def vector(seed):
+    return np.random.default_rng(seed).random(384)
+
+
+def test_saves_are_debounced_and_reload(tmp_path):
+    cache = AnswerCache(str(tmp_path), save_delay=60)
+    for i in range(5):
+        cache.put(f"question {i}", vector(i), f"answer {i}", ["source"])
+    assert not os.path.exists(tmp_path / CACHE_FILE)  # still pending
+
+    cache.flush()
+    reloaded = AnswerCache(str(tmp_path), save_delay=0)
+    assert reloaded.get_exact("Question 3?").text == "answer 3"
+    assert reloaded.get_similar(vector(4)).text == "answer 4"
+
+
+def test_single_file_written_atomically(tmp_path):
+    cache = AnswerCache(str(tmp_path), save_delay=0)
+    cache.put("fever", vector(0), "rest", [])
+    assert os.listdir(tmp_path) == [CACHE_FILE]  # no temporary files left behind
+
+
+def test_legacy_two_file_cache_still_loads(tmp_path):
+    records = [{"query": "cough", "text": "honey", "sources": [], "created": 1e12}]
+    with open(tmp_path / "entries.json", "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    np.save(tmp_path / "embeddings.npy", np.ones((1, 384), dtype=np.float32))
+    assert AnswerCache(str(tmp_path), ttl=None).get_exact("cough").text == "honey"
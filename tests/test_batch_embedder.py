@@ -0,0 +1,33 @@
+import pytest
+
+from medibot.batch_embedder import BatchingEmbedder
+from medibot.benchmark_rag import HashingEmbeddings
+
+
+class ShortOnce(HashingEmbeddings):
+    """Returns one vector too few on the first batch."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        vectors = super().embed_documents(texts)
+        return vectors[:-1] if self.calls == 1 else vectors
+
+
+def test_bad_batch_fails_its_callers_and_worker_survives():
+    embedder = BatchingEmbedder(ShortOnce(), timeout=5)
+    try:
+        with pytest.raises(ValueError):
+            embedder.embed_query("fever")
+        assert len(embedder.embed_query("cough")) == 384
+    finally:
+        embedder.close()
+
+
+def test_queries_after_close_are_embedded_inline():
+    embedder = BatchingEmbedder(HashingEmbeddings(), timeout=5)
+    embedder.close()
+    assert embedder.embed_query("rash") == HashingEmbeddings().embed_query("rash")
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from mediguide import bundle as bundle_module
+from mediguide.bundle import BundleError, BundleWriter, load_bundle
+
+
+def write_bundle(path):
+    with BundleWriter(str(path), kind="test", version="1") as writer:
+        writer.add_array("weights", np.arange(100, dtype=np.float32))
+        writer.add_strings("names", ["fever", "cough"])
+
+
+def tamper(path):
+    # Same shape, dtype and size: only the checksum can tell.
+    array = np.load(path)
+    array[0] = 42
+    np.save(path, array)
+
+
+def test_untouched_bundle_loads_without_hashing(tmp_path, monkeypatch):
+    write_bundle(tmp_path)
+    monkeypatch.setattr(bundle_module, "_sha256", lambda path: pytest.fail("hashed"))
+    bundle = load_bundle(str(tmp_path), kind="test")
+    assert bundle["weights"][99] == 99
+    assert list(bundle["names"]) == ["fever", "cough"]
+
+
+def test_modified_file_fails_checksum_on_load(tmp_path):
+    write_bundle(tmp_path)
+    tamper(tmp_path / "weights.npy")
+    bundle = load_bundle(str(tmp_path), kind="test")
+    with pytest.raises(BundleError, match="weights.npy"):
+        bundle["weights"]
+    assert list(bundle["names"]) == ["fever", "cough"]
+
+
+def test_touched_but_identical_file_still_loads(tmp_path):
+    write_bundle(tmp_path)
+    os.utime(tmp_path / "weights.npy", ns=(0, 0))
+    assert load_bundle(str(tmp_path), kind="test")["weights"][0] == 0
+
+
+def test_verify_checks_every_file_up_front(tmp_path):
+    write_bundle(tmp_path)
+    tamper(tmp_path / "weights.npy")
+    with pytest.raises(BundleError, match="Checksum mismatch"):
+        load_bundle(str(tmp_path), kind="test", verify=True)
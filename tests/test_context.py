@@ -0,0 +1,33 @@
+from langchain_core.documents import Document
+
+from medibot.context import join_overlapping, merge_adjacent
+from medibot.create_memory_for_llm import get_text_splitter
+
+
+def test_short_coincidental_match_is_not_fused():
+    assert join_overlapping("Parents", "should not") == "Parents\nshould not"
+    assert join_overlapping("may cause", "severe pain") == "may cause\nsevere pain"
+    assert join_overlapping("to obstruct", "the airway") == "to obstruct\nthe airway"
+
+
+def test_real_overlap_is_removed_without_offsets():
+    shared = "the splitter repeats this sentence"
+    first = "Chest pain on exertion; " + shared
+    second = shared + " in the next chunk."
+    assert join_overlapping(first, second) == "Chest pain on exertion; " + shared + " in the next chunk."
+
+
+def test_merge_adjacent_uses_start_index():
+    page = " ".join(f"word{i}" for i in range(400))
+    chunks = get_text_splitter().split_documents([Document(page_content=page)])
+    ids = [f"page-{i}" for i in range(len(chunks))]
+    merged = merge_adjacent(chunks, ids)
+    assert len(merged) == 1
+    assert merged[0].page_content.replace("\n", " ") == page
+
+
+def test_non_overlapping_neighbours_are_not_fused():
+    docs = [Document(page_content="Parents", metadata={"start_index": 0}),
+            Document(page_content="should rest.", metadata={"start_index": 8})]
+    merged = merge_adjacent(docs, ["page-0", "page-1"])
+    assert merged[0].page_content == "Parents\nshould rest."
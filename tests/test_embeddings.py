@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from medibot.embeddings import (
+    MIN_COSINE,
+    ONNX_FILE,
+    ONNX_INT8_FILE,
+    ONNX_MODEL_DIR,
+    PARITY_SENTENCES,
+    parity,
+)
+
+
+@pytest.mark.parametrize("backend, filename", [("onnx", ONNX_FILE), ("onnx-int8", ONNX_INT8_FILE)])
+def test_onnx_backend_agrees_with_torch(backend, filename):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    pytest.importorskip("langchain_huggingface")
+    if not os.path.exists(os.path.join(ONNX_MODEL_DIR, filename)):
+        pytest.skip("exported ONNX model not found; run python -m medibot.embeddings export")
+
+    cosines = parity(backend, PARITY_SENTENCES)
+    assert len(cosines) == len(PARITY_SENTENCES)
+    assert cosines.min() >= MIN_COSINE[backend]
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from medibot.benchmark_rag import HashingEmbeddings, make_fixture_pdfs
+from medibot.create_memory_for_llm import DATA_PATH, ingest, list_pdf_files
+from medibot.faiss_index import load_faiss, make_index_spec, supports_removal
+
+
+@pytest.mark.parametrize("kind", ["flat", "hnsw", "ivf-flat", "ivf-pq", "sq8"])
+def test_supports_removal_only_for_compacting_indexes(kind):
+    # IVF remove_ids keeps the original ids while LangChain renumbers
+    # index_to_docstore_id, so only flat-code indexes can drop vectors.
+    assert supports_removal(make_index_spec(kind)) == (kind in ("flat", "sq8"))
+
+
+@pytest.mark.skipif(len(list_pdf_files(DATA_PATH)) < 2, reason="needs two source PDFs")
+@pytest.mark.parametrize("read_only", [False, True])
+def test_ivf_flat_search_after_deleting_a_file(tmp_path, read_only):
+    data = make_fixture_pdfs(str(tmp_path / "data"), pages=6)
+    db_path = str(tmp_path / "db")
+    embedder = HashingEmbeddings()
+    spec = make_index_spec("ivf-flat", nlist=4)
+
+    ingest(data, db_path, workers=1, index_spec=spec, embedding_model=embedder)
+    removed = sorted(os.listdir(data))[0]
+    os.remove(os.path.join(data, removed))
+    ingest(data, db_path, workers=1, index_spec=spec, embedding_model=embedder)
+
+    db = load_faiss(db_path, embedder, read_only=read_only)
+    assert db.index.ntotal == len(db.index_to_docstore_id)
+    docs = db.similarity_search("symptoms and treatment of disease", k=10)
+    assert docs
+    assert all(os.path.basename(d.metadata["source"]) != removed for d in docs)
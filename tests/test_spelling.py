@@ -0,0 +1,15 @@
+import json
+
+from mediguide.spelling import WARM_START_PATH
+from mediguide.symptoms import SymptomEncoder, load_feature_columns
+
+
+def test_warm_start_agrees_with_matcher():
+    # A warm cache must give the same answer as a cold one.
+    encoder = SymptomEncoder(load_feature_columns(), warm_start_path=None)
+    with open(WARM_START_PATH, encoding="utf-8") as f:
+        known = json.load(f)
+    mismatched = {token: (name, encoder.corrector.match(token))
+                  for token, name in known.items()
+                  if encoder.corrector.match(token) != name}
+    assert mismatched == {}